@@ -8,14 +8,13 @@ import time
 import queue
 import threading
 import signal
+import itertools
+import logging
+import concurrent.futures
 import pyaudio
 import numpy as np
-import pyautogui
+import grpc
 from typing import Optional
-from infi.systray import SysTrayIcon
-import tkinter as tk
-from tkinter import ttk, messagebox
-import requests
 
 # Riva client imports
 import riva.client
@@ -24,26 +23,124 @@ import riva.client.proto.riva_asr_pb2 as riva_asr_pb2
 import riva.client.proto.riva_audio_pb2 as riva_audio_pb2
 
 from .config import Config
-from .gui.widgets import StatusWidget, CursorIndicator
+from .diagnostics import diagnose_connection
+
+# GUI-only dependencies (tkinter, infi.systray, pyautogui) are imported lazily
+# so that headless mode never pays for loading them.
+
+log = logging.getLogger("riva_dictation")
+
+# Public ASRService API, computed once for debug output
+_ASR_METHODS = tuple(m for m in dir(riva.client.ASRService) if not m.startswith('_'))
+
+# Worker threads for reconnecting to Riva off the Tk thread
+_SETUP_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="riva-setup")
+
+# Dialog colors, normalized to hex so every widget passes Tk the same strings
+_COLORS = {
+    'primary': '#1976d2',          # Material Blue 700
+    'on_primary': '#ffffff',
+    'surface_variant': '#f5f5f5',
+}
+
+
+# Settings dialog layout: (section, config key, label, kind, widget options).
+# "row" groups fields on one line; "enabled_by" ties a field to a checkbox.
+SETTINGS_SCHEMA = [
+    ("Server Settings", "endpoint_type", "Endpoint Type:", "combo", {"values": ["local", "custom"]}),
+    ("Server Settings", "custom_endpoint", "Custom Endpoint:", "entry", {}),
+    ("Server Settings", "custom_asr_port", "ASR Port:", "spin",
+     {"from_": 1, "to": 65535, "width": 8, "row": "ports"}),
+    ("Server Settings", "use_separate_health_port", "Separate Health Port:", "check", {"row": "ports"}),
+    ("Server Settings", "custom_health_port", None, "spin",
+     {"from_": 1, "to": 65535, "width": 8, "row": "ports", "enabled_by": "use_separate_health_port"}),
+    ("Server Settings", "use_ssl", "Use SSL", "check", {}),
+    ("General Settings", "auto_type", "Auto-type text", "check", {}),
+    ("General Settings", "show_widget", "Show status widget", "check", {}),
+    ("General Settings", "hotkey", "Hotkey:", "entry", {}),
+    ("ASR Quality Settings", "audio_encoding", "Audio Encoding:", "combo",
+     {"values": ["LINEAR_PCM", "FLAC"], "state": "readonly"}),
+    ("ASR Quality Settings", "max_alternatives", "Max Alternatives (1-5):", "spin", {"from_": 1, "to": 5}),
+    ("ASR Quality Settings", "profanity_filter", "Enable profanity filter", "check", {}),
+    ("ASR Quality Settings", "verbatim_transcripts", "Verbatim transcripts (no text normalization)", "check", {}),
+    ("ASR Quality Settings", "model_name", "Model Name (optional):", "entry", {}),
+]
+
+# Hints shown at the bottom of a settings section
+SETTINGS_TIPS = {
+    "Server Settings": "💡 Port remapping: ASR port for recognition service, Health port for service monitoring",
+    "ASR Quality Settings": "💡 Tip: Add speech contexts in config file for better recognition of specific terms",
+}
+
+
+class RivaChannelPool:
+    """Round-robin pool of gRPC channels, each on its own connection, to a single Riva server"""
+
+    # Ping during active streams so a dead connection is detected promptly
+    KEEPALIVE_OPTIONS = [
+        ('grpc.keepalive_time_ms', 30000),
+        ('grpc.keepalive_timeout_ms', 10000),
+    ]
+
+    def __init__(self, server, use_ssl=False, size=2, options=None):
+        self.server = server
+        self.use_ssl = use_ssl
+        channel_options = list(options or []) + self.KEEPALIVE_OPTIONS
+        # gRPC shares one connection between channels with identical target and
+        # args; a local subchannel pool plus a per-channel id gives each its own
+        self.auths = [
+            riva.client.Auth(uri=server, use_ssl=use_ssl, options=channel_options + [
+                ('grpc.use_local_subchannel_pool', 1),
+                ('grpc.channel_id', i),
+            ])
+            for i in range(max(1, size))
+        ]
+        self._services = [riva.client.ASRService(auth) for auth in self.auths]
+        self._next_service = itertools.cycle(self._services)
+        self._lock = threading.Lock()
+
+    def get_asr_service(self):
+        """Return the ASR service bound to the next channel in the pool"""
+        with self._lock:
+            return next(self._next_service)
+
+    def close(self):
+        """Close all channels in the pool"""
+        for auth in self.auths:
+            auth.channel.close()
+
 
 class ModernDictationApp:
     """Main application class for Riva Dictation"""
 
-    def __init__(self, headless=False):
-        # Configuration
-        self.config = Config()
+    def __init__(self, headless=False, config=None):
+        # Configuration (the CLI passes one carrying its flag overrides)
+        self.config = config if config is not None else Config()
         self.headless = headless
 
         # Audio setup like working version
-        self.rate = self.config.get("sample_rate", 16000)
-        self.chunk = self.config.get("chunk_size", 256)
+        cfg = self.config.snapshot
+        self.rate = cfg.sample_rate
+        self.chunk = cfg.chunk_size
         self.format = pyaudio.paInt16  # Use Int16 like working version
         self.channels = 1
         self.audio = pyaudio.PyAudio()
-        self.stream = None
+        self.audio_thread = None
         self.input_device_index = None
         self.recording = False
-        self.audio_queue = queue.Queue(maxsize=self.config.get("queue_size", 5))
+        self.audio_queue = queue.Queue(maxsize=cfg.queue_size)
+        # Signaled by the capture side whenever audio is queued
+        self._data_ready = threading.Event()
+        # Signaled when recording stops so the capture thread can close the stream;
+        # replaced per session so a lingering thread never sees the next one's
+        self._stop_event = threading.Event()
+        # Keep-alive silence sent while no audio is arriving, built once and
+        # reused (along with its request message) for every idle frame
+        self._silence_chunk = np.zeros(self.chunk, dtype=np.int16).tobytes()
+        self._silence_request = riva_asr_pb2.StreamingRecognizeRequest(audio_content=self._silence_chunk)
+
+        # Hot-path settings, refreshed whenever settings are saved
+        self._load_hot_config()
 
         # Text tracking like working version
         self.current_text = ""
@@ -52,14 +149,41 @@ class ModernDictationApp:
 
         # Riva client
         self.riva_client = None
+        self.channel_pool = None
+        self._use_flac = False
+        # Guards swapping the Riva client/config; setup_riva may run on a worker thread
+        self._riva_lock = threading.Lock()
+        # Pools replaced mid-stream, closed once the stream using them ends
+        self._streaming = False
+        self._retired_pools = []
+        self._setup_lock = threading.Lock()
         self.recognition_config = None
+        self._setup_future = None
+        # Test Connection clients keyed by (server, use_ssl), reused across clicks
+        self._auth_cache = {}
+
+        # Dialogs are built on first open and reused afterwards
+        self._mic_dialog = None
+        self._mic_listbox = None
+        self._settings_dialog = None
+        self._settings_vars = {}
 
         # GUI components (only if not headless)
         if not self.headless:
+            import tkinter as tk
+            from .gui.widgets import StatusWidget, CursorIndicator
+
             # Hidden Tkinter root for dialogs
             self.root = tk.Tk()
             self.root.withdraw()  # Hide the main window
 
+            # Settings form variables, created once; the dialog binds to them
+            var_types = {"check": tk.BooleanVar, "spin": tk.IntVar}
+            self._settings_vars = {
+                key: var_types.get(kind, tk.StringVar)(self.root)
+                for _, key, _, kind, _ in SETTINGS_SCHEMA
+            }
+
             # GUI components
             self.status_widget = StatusWidget(self)
             self.cursor_indicator = CursorIndicator(self)
@@ -81,11 +205,47 @@ class ModernDictationApp:
         # Setup hotkeys
         self.setup_hotkeys()
 
+        # Cache input devices; enumeration is slow on some host APIs (e.g. WASAPI)
+        self._device_cache = self._enumerate_input_devices()
+
+    def _load_hot_config(self):
+        """Copy settings read on every transcript into plain attributes"""
+        cfg = self.config.snapshot
+        self._auto_type = cfg.auto_type
+        self._type_interval = cfg.type_interval
+
+    def _enumerate_input_devices(self):
+        """Return a list of (index, name) tuples for all input devices"""
+        devices = []
+        try:
+            for i in range(self.audio.get_device_count()):
+                info = self.audio.get_device_info_by_index(i)
+                if info.get('maxInputChannels', 0) > 0:
+                    devices.append((i, info['name']))
+        except Exception as e:
+            print(f"⚠️ Device enumeration failed: {e}")
+        return devices
+
+    def _refresh_input_devices(self):
+        """Reinitialize PortAudio and re-enumerate input devices"""
+        # PortAudio fixes its device list at initialization, so a new
+        # instance is needed to see devices plugged in since then
+        if self.recording:
+            print("⚠️ Stop recording before refreshing audio devices")
+            return
+        self.audio.terminate()
+        self.audio = pyaudio.PyAudio()
+        self._device_cache = self._enumerate_input_devices()
+        # Device indices may have shifted; re-resolve the selected input
+        self.setup_audio()
+
     def create_systray(self):
         """Create system tray icon and menu"""
         if self.headless:
             return
 
+        from infi.systray import SysTrayIcon
+
         menu_options = (
             ("Select Microphone", None, self.select_microphone),
             ("Settings", None, self.show_settings),
@@ -100,12 +260,27 @@ class ModernDictationApp:
             print("💡 Configure microphone in config file or run without --no-gui flag")
             return
 
+        import tkinter as tk
+
+        # Reuse the dialog if it has already been built
+        if self._mic_dialog is not None and self._mic_dialog.winfo_exists():
+            self._populate_mic_list()
+            self._mic_dialog.deiconify()
+            self._mic_dialog.grab_set()
+            return
+
         def _show_microphone_dialog():
             dialog = tk.Toplevel(self.root)
             dialog.title("Select Microphone")
             dialog.geometry("400x300")
             dialog.grab_set()
 
+            def close_dialog():
+                dialog.grab_release()
+                dialog.withdraw()
+
+            dialog.protocol("WM_DELETE_WINDOW", close_dialog)
+
             # Create microphone list
             mic_frame = tk.Frame(dialog, padx=24, pady=24)
             mic_frame.pack(fill=tk.BOTH, expand=True)
@@ -113,25 +288,22 @@ class ModernDictationApp:
             tk.Label(mic_frame, text="Available Microphones:").pack(anchor=tk.W)
             mic_listbox = tk.Listbox(mic_frame, height=10)
             mic_listbox.pack(fill=tk.BOTH, expand=True, pady=(0, 16))
+            self._mic_listbox = mic_listbox
 
-            # Populate microphone list with all input devices
-            device_count = self.audio.get_device_count()
-            devices = []
-            for i in range(device_count):
-                info = self.audio.get_device_info_by_index(i)
-                if info.get('maxInputChannels', 0) > 0:
-                    devices.append((i, info['name']))
-                    mic_listbox.insert(tk.END, f"{i}: {info['name']}")
+            self._populate_mic_list()
+
+            def refresh_devices():
+                self._refresh_input_devices()
+                self._populate_mic_list()
 
             def save_selection():
                 selection = mic_listbox.curselection()
                 if selection:
-                    device_idx = devices[selection[0]][0]
-                    device_name = devices[selection[0]][1]
+                    device_idx, device_name = self._device_cache[selection[0]]
                     self.config.set("input_device_index", device_idx)  # Use correct config key
                     self.input_device_index = device_idx
                     self.setup_audio()  # Reinitialize audio with new device
-                    dialog.destroy()
+                    close_dialog()
                     print(f"🎤 Microphone selected: {device_idx}: {device_name}")
 
             # Buttons
@@ -140,15 +312,33 @@ class ModernDictationApp:
 
             save_button = tk.Button(button_frame, text="Save",
                                   font=("Segoe UI", 12),
-                                  bg='#1976d2',
-                                  fg='white',
+                                  bg=_COLORS['primary'],
+                                  fg=_COLORS['on_primary'],
                                   relief='flat',
                                   command=save_selection)
             save_button.pack(side=tk.RIGHT)
 
+            refresh_button = tk.Button(button_frame, text="Refresh",
+                                     font=("Segoe UI", 12),
+                                     bg=_COLORS['surface_variant'],
+                                     fg=_COLORS['primary'],
+                                     relief='flat',
+                                     command=refresh_devices)
+            refresh_button.pack(side=tk.LEFT)
+
+            self._mic_dialog = dialog
+
         # Call directly since we're now using mainloop
         _show_microphone_dialog()
 
+    def _populate_mic_list(self):
+        """Fill the microphone listbox from the cached input devices"""
+        import tkinter as tk
+
+        self._mic_listbox.delete(0, tk.END)
+        for i, name in self._device_cache:
+            self._mic_listbox.insert(tk.END, f"{i}: {name}")
+
     def setup_audio(self):
         """Setup audio input stream like working version"""
         try:
@@ -164,31 +354,88 @@ class ModernDictationApp:
             print(f"❌ Audio setup failed: {e}")
             self.input_device_index = None
 
+    def _close_test_clients(self):
+        """Close and forget cached Test Connection clients"""
+        for auth, _ in self._auth_cache.values():
+            auth.channel.close()
+        self._auth_cache.clear()
+
+    def _probe_connection(self, test_server, test_use_ssl):
+        """Check that an endpoint serves Riva ASR; return its model count (worker thread)"""
+        log.debug("[Test] Testing connection to: %s (SSL: %s)", test_server, test_use_ssl)
+
+        # Held for the whole probe so setup_riva can't close the client mid-use
+        with self._setup_lock:
+            key = (test_server, test_use_ssl)
+            with self._riva_lock:
+                pool = self.channel_pool
+            if pool is not None and (pool.server, pool.use_ssl) == key:
+                # Same endpoint as the live connection: probe one of its channels
+                test_client = pool.get_asr_service()
+            else:
+                # Reuse the client from a previous click on the same endpoint
+                cached = self._auth_cache.get(key)
+                if cached is None:
+                    auth = riva.client.Auth(uri=test_server, use_ssl=test_use_ssl,
+                                            options=self._channel_options())
+                    cached = (auth, riva.client.ASRService(auth))
+                    self._auth_cache[key] = cached
+                else:
+                    log.debug("[Test] Reusing cached ASR client")
+                test_client = cached[1]
+
+            # Verify the channel actually connects (instant if already ready)
+            try:
+                grpc.channel_ready_future(test_client.auth.channel).result(timeout=5)
+            except grpc.FutureTimeoutError:
+                stale = self._auth_cache.pop(key, None)
+                if stale:
+                    stale[0].channel.close()
+                raise Exception(f"Timed out connecting to {test_server}")
+
+            # A cheap unary call proves the server speaks the Riva ASR protocol
+            asr_config = test_client.stub.GetRivaSpeechRecognitionConfig(
+                riva_asr_pb2.RivaSpeechRecognitionConfigRequest(),
+                metadata=test_client.auth.get_auth_metadata(),
+                timeout=5
+            )
+
+        model_count = len(asr_config.model_config)
+        log.info("[Test] ASR service responded (%d models)", model_count)
+
+        # Show available methods for debugging
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("[Test] Available methods: %s...", ', '.join(_ASR_METHODS[:10]))
+        return model_count
+
+    def _open_channel_pool(self, server, use_ssl):
+        """Replace the channel pool and point riva_client at its first channel"""
+        pool = RivaChannelPool(server, use_ssl,
+                               size=self.config.get("grpc_pool_size", 2),
+                               options=self._channel_options())
+        with self._riva_lock:
+            old_pool, self.channel_pool = self.channel_pool, pool
+            self.riva_client = pool.get_asr_service()
+            if old_pool and self._streaming:
+                # A recording may still be using it; _stream_to_riva closes it
+                self._retired_pools.append(old_pool)
+                old_pool = None
+        if old_pool:
+            old_pool.close()
+
+    def _close_retired_pools(self):
+        """Close channel pools that were replaced while a stream was running"""
+        with self._riva_lock:
+            retired, self._retired_pools = self._retired_pools, []
+        for pool in retired:
+            pool.close()
+
     def setup_riva(self):
         """Setup Riva client connection"""
         def connect():
             try:
                 # Get server configuration
-                endpoint_type = self.config.get("endpoint_type")
-                if endpoint_type == "custom":
-                    custom_endpoint = self.config.get("custom_endpoint")
-                    custom_asr_port = self.config.get("custom_asr_port", 50051)
-
-                    # Build server string with custom port
-                    if custom_endpoint:
-                        # If endpoint already has port, use as-is, otherwise add custom port
-                        if ':' in custom_endpoint:
-                            server = custom_endpoint
-                        else:
-                            server = f"{custom_endpoint}:{custom_asr_port}"
-                    else:
-                        server = f"localhost:{custom_asr_port}"
-
-                    use_ssl = self.config.get("use_ssl")
-                else:
-                    endpoint = self.config.get("endpoints", {}).get(endpoint_type, {})
-                    server = endpoint.get("server", "localhost:50051")
-                    use_ssl = endpoint.get("use_ssl", False)
+                server, use_ssl = self.config.resolved_endpoint
 
                 print(f"🔗 Connecting to: {server} {'(SSL)' if use_ssl else ''}")
 
@@ -196,8 +443,7 @@ class ModernDictationApp:
                 connection_timeout = self.config.get("connection_timeout", 30)
 
                 try:
-                    auth = riva.client.Auth(uri=server, use_ssl=use_ssl)
-                    self.riva_client = riva.client.ASRService(auth)
+                    self._open_channel_pool(server, use_ssl)
 
                     # Test the connection by trying to create a simple config
                     # This will fail early if the connection is not working
@@ -271,11 +517,10 @@ class ModernDictationApp:
                         if not use_ssl and self.config.get("auto_retry_ssl", True):
                             print("🔄 Attempting connection with SSL...")
                             try:
-                                auth_ssl = riva.client.Auth(uri=server, use_ssl=True)
-                                self.riva_client = riva.client.ASRService(auth_ssl)
+                                self._open_channel_pool(server, True)
                                 print("✅ SSL connection successful!")
                                 # Update config to remember this works
-                                self.config.set("use_ssl", True)
+                                self._remember_ssl()
                                 use_ssl = True
                             except Exception as ssl_error:
                                 print(f"❌ SSL connection also failed: {ssl_error}")
@@ -321,8 +566,15 @@ class ModernDictationApp:
                     "LINEAR_PCM": riva_audio_pb2.AudioEncoding.LINEAR_PCM,
                     "FLAC": riva_audio_pb2.AudioEncoding.FLAC
                 }
-                encoding = encoding_map.get(self.config.get("audio_encoding", "LINEAR_PCM"),
-                                           riva_audio_pb2.AudioEncoding.LINEAR_PCM)
+                audio_encoding = self.config.get("audio_encoding", "FLAC")
+                if audio_encoding == "FLAC":
+                    try:
+                        import pyflac  # noqa: F401
+                    except ImportError:
+                        print("⚠️ FLAC encoding requires the 'pyflac' package, using LINEAR_PCM")
+                        audio_encoding = "LINEAR_PCM"
+                use_flac = audio_encoding == "FLAC"
+                encoding = encoding_map.get(audio_encoding, riva_audio_pb2.AudioEncoding.LINEAR_PCM)
 
                 # Build speech contexts if configured
                 speech_contexts = []
@@ -345,7 +597,7 @@ class ModernDictationApp:
                         stop_threshold=self.config.get("stop_threshold", 0.3)
                     )
 
-                self.recognition_config = RecognitionConfig(
+                recognition_config = RecognitionConfig(
                     encoding=encoding,
                     sample_rate_hertz=self.rate,
                     language_code=self.config.get("language_code"),
@@ -358,6 +610,9 @@ class ModernDictationApp:
                     speech_contexts=speech_contexts,
                     endpointing_config=endpointing_config
                 )
+                with self._riva_lock:
+                    self.recognition_config = recognition_config
+                    self._use_flac = use_flac
 
                 self.safe_update_status("Ready", "Connected to Riva server")
                 return True
@@ -365,9 +620,51 @@ class ModernDictationApp:
                 self.safe_update_status("Error", f"Failed to connect: {str(e)}")
                 return False
 
-        # Initial connection
-        if not connect():
-            self.safe_update_status("Error", "Failed to connect to Riva server")
+        # Initial connection; concurrent reconnects and probes run one at a time
+        with self._setup_lock:
+            # Settings may have changed, so cached test clients are stale
+            self._close_test_clients()
+            if not connect():
+                self.safe_update_status("Error", "Failed to connect to Riva server")
+                return False
+        return True
+
+    def _remember_ssl(self):
+        """Record that the server needs SSL, on the Tk thread when there is one"""
+        if self.root and threading.current_thread() is not threading.main_thread():
+            # Config is not thread-safe; hand the change to the Tk thread
+            self.root.after(0, self._remember_ssl)
+            return
+        # Keep a CLI choice session-only rather than persisting over it
+        if self.config.is_overridden("use_ssl"):
+            self.config.override("use_ssl", True)
+        else:
+            self.config.set("use_ssl", True)
+
+    def reconnect_riva(self):
+        """Run setup_riva on a worker thread and return its future"""
+        self.safe_update_status("Connecting", "Connecting to Riva server...")
+        future = self._setup_future = _SETUP_POOL.submit(self.setup_riva)
+        future.add_done_callback(self._on_riva_ready)
+        return future
+
+    def _on_riva_ready(self, future):
+        """Report reconnect failures that escaped setup_riva"""
+        # setup_riva posts its own Ready/Error status; this only catches crashes
+        error = future.exception()
+        if error is not None:
+            self.safe_update_status("Error", f"Failed to connect: {error}")
+
+    def _channel_options(self):
+        """Build gRPC channel options from config"""
+        options = list(self.config.get("grpc_options", {}).items())
+        compression = {
+            "gzip": grpc.Compression.Gzip,
+            "deflate": grpc.Compression.Deflate,
+        }.get(str(self.config.get("grpc_compression", "none")).lower())
+        if compression is not None:
+            options.append(("grpc.default_compression_algorithm", compression))
+        return options
 
     def safe_update_status(self, status: str, message: str = ""):
         """Thread-safe status update"""
@@ -380,7 +677,7 @@ class ModernDictationApp:
             return
 
         if self.status_widget:
-            self.status_widget.gui_queue.put({
+            self.status_widget.post_update({
                 'type': 'status',
                 'status': status,
                 'message': message
@@ -417,6 +714,11 @@ class ModernDictationApp:
             return
 
         self.recording = True
+        self._stop_event = threading.Event()
+        # Spread streams across the pooled channels
+        with self._riva_lock:
+            if self.channel_pool:
+                self.riva_client = self.channel_pool.get_asr_service()
         self.current_text = ""
         self.last_typed_length = len(self.final_text)
 
@@ -428,7 +730,7 @@ class ModernDictationApp:
             self.cursor_indicator.show_indicator()
 
         # Start audio capture thread
-        self.audio_thread = threading.Thread(target=self._capture_audio)
+        self.audio_thread = threading.Thread(target=self._capture_audio, args=(self._stop_event,))
         self.audio_thread.daemon = True
         self.audio_thread.start()
 
@@ -443,6 +745,7 @@ class ModernDictationApp:
             return
 
         self.recording = False
+        self._stop_event.set()
         self.safe_update_status("Ready", "Stopped recording")
         self.safe_update_icon(False)
 
@@ -457,61 +760,74 @@ class ModernDictationApp:
             except queue.Empty:
                 break
 
+        # Wake the audio generator so it notices recording has stopped
+        self._data_ready.set()
+
+    def _enqueue_audio(self, data):
+        """Queue an audio chunk without blocking, dropping the oldest if full"""
+        try:
+            self.audio_queue.put_nowait(data)
+        except queue.Full:
+            # Discard oldest chunk to prevent latency buildup
+            try:
+                self.audio_queue.get_nowait()
+                self.audio_queue.put_nowait(data)
+            except (queue.Empty, queue.Full):
+                pass
+        self._data_ready.set()
+
     def _audio_callback(self, in_data, frame_count, time_info, status):
-        """Audio stream callback"""
+        """Audio stream callback (runs on the PortAudio thread, must never block)"""
         if self.recording:
-            self.audio_queue.put(in_data)
+            self._enqueue_audio(in_data)
         return (in_data, pyaudio.paContinue)
 
-    def _capture_audio(self):
-        """Capture audio from microphone"""
+    def _capture_audio(self, stop_event):
+        """Capture audio from microphone until this session's stop_event is set"""
         try:
-            # Setup audio stream like working version
-            self.stream = self.audio.open(
+            # Callback mode: PortAudio hands each chunk straight to _audio_callback
+            stream = self.audio.open(
                 format=self.format,
                 channels=self.channels,
                 rate=self.rate,
                 input=True,
                 input_device_index=self.input_device_index,
                 frames_per_buffer=self.chunk,
-                start=False
+                start=False,
+                stream_callback=self._audio_callback
             )
 
             # Start the stream
-            self.stream.start_stream()
+            stream.start_stream()
 
-            while self.recording:
-                try:
-                    # Read audio data
-                    data = self.stream.read(self.chunk, exception_on_overflow=False)
-                    if self.recording:
-                        # Add to queue, discard if full to prevent latency buildup
-                        try:
-                            self.audio_queue.put_nowait(data)
-                        except queue.Full:
-                            # Discard oldest chunk
-                            try:
-                                self.audio_queue.get_nowait()
-                                self.audio_queue.put_nowait(data)
-                            except queue.Empty:
-                                pass
-                except Exception as e:
-                    if self.recording:
-                        print(f"⚠️ Audio capture error: {e}")
-                    break
+            # Data flows via the callback; just wait for this session to stop
+            while not stop_event.is_set() and stream.is_active():
+                stop_event.wait(0.1)
+
+            stream.stop_stream()
+            stream.close()
 
         except Exception as e:
             print(f"❌ Audio stream setup failed: {e}")
-            self.recording = False
-            self.safe_update_status("Error", "Audio failed")
+            # Only fail the session this thread belongs to
+            if not stop_event.is_set():
+                self.recording = False
+                self.safe_update_status("Error", "Audio failed")
 
     def _stream_to_riva(self):
         """Stream audio to Riva server"""
         try:
             print("🎤 Starting recognition...")
 
+            # Take a consistent view of the connection; setup_riva may swap it
+            with self._riva_lock:
+                riva_client = self.riva_client
+                recognition_config = self.recognition_config
+                use_flac = self._use_flac
+                self._streaming = True
+
             # Validate client connection before streaming
-            if not self.riva_client:
+            if not riva_client:
                 print("❌ No Riva client available")
                 self.safe_update_status("Error", "No Riva client")
                 self.stop_recording()
@@ -519,42 +835,69 @@ class ModernDictationApp:
 
             # Create streaming config using the same recognition config
             streaming_config = riva_asr_pb2.StreamingRecognitionConfig(
-                config=self.recognition_config,
+                config=recognition_config,
                 interim_results=True
             )
 
             def audio_generator():
                 while self.recording:
-                    try:
-                        data = self.audio_queue.get(timeout=0.01)
-                        yield data
-                    except queue.Empty:
+                    if not self._data_ready.wait(timeout=0.1):
                         # Yield silence to keep stream alive
-                        yield b'\x00' * (self.chunk * 2)
+                        yield self._silence_chunk
                         continue
+                    self._data_ready.clear()
+                    # Drain everything queued since the last wakeup
+                    while True:
+                        try:
+                            yield self.audio_queue.get_nowait()
+                        except queue.Empty:
+                            break
 
             # Try different streaming methods
             responses = None
             try:
                 # Method 1: Try streaming_response_generator
-                if hasattr(self.riva_client, 'streaming_response_generator'):
-                    responses = self.riva_client.streaming_response_generator(
-                        audio_generator(),
+                if hasattr(riva_client, 'streaming_response_generator'):
+                    audio_chunks = audio_generator()
+                    if use_flac:
+                        audio_chunks = self._flac_encode(audio_chunks)
+                    responses = riva_client.streaming_response_generator(
+                        audio_chunks,
                         streaming_config
                     )
                 # Method 2: Try StreamingRecognize
-                elif hasattr(self.riva_client, 'StreamingRecognize'):
+                elif hasattr(riva_client, 'StreamingRecognize'):
                     def request_generator():
                         # First request with config
                         yield riva_asr_pb2.StreamingRecognizeRequest(streaming_config=streaming_config)
-                        # Subsequent requests with audio
+                        # Subsequent requests with audio, batched to ~50ms of source
+                        # PCM per message; batching happens before FLAC encoding
+                        target_bytes = self.rate * 2 // 20
+                        encode, finish = self._flac_encoder() if use_flac else (bytes, None)
+                        buf = bytearray()
                         for audio_data in audio_generator():
-                            yield riva_asr_pb2.StreamingRecognizeRequest(audio_content=audio_data)
-
-                    responses = self.riva_client.StreamingRecognize(request_generator())
+                            silence = audio_data is self._silence_chunk
+                            if silence and not buf and not use_flac:
+                                # Prebuilt keep-alive request (raw PCM only)
+                                yield self._silence_request
+                                continue
+                            buf.extend(audio_data)
+                            # Keep-alive silence means nothing else is queued, so flush
+                            if silence or len(buf) >= target_bytes:
+                                payload = encode(bytes(buf))
+                                buf.clear()
+                                if payload:
+                                    yield riva_asr_pb2.StreamingRecognizeRequest(audio_content=payload)
+                        payload = encode(bytes(buf)) if buf else b''
+                        if finish:
+                            payload += finish()
+                        if payload:
+                            yield riva_asr_pb2.StreamingRecognizeRequest(audio_content=payload)
+
+                    responses = riva_client.StreamingRecognize(request_generator())
                 else:
                     print("❌ No streaming method found!")
-                    available_methods = [method for method in dir(self.riva_client) if not method.startswith('_')]
+                    available_methods = [method for method in dir(riva_client) if not method.startswith('_')]
                     print(f"Available methods: {', '.join(available_methods)}")
                     self.safe_update_status("Error", "Streaming not supported")
                     return
@@ -562,39 +905,59 @@ class ModernDictationApp:
                 if responses:
                     empty_response_count = 0
                     last_interim = ""
+                    last_interim_len = 0
+                    last_interim_hash = 0
+
+                    # Hoist per-stream lookups out of the response loop
+                    auto_type = self._auto_type
+                    safe_update_status = self.safe_update_status
 
                     for response in responses:
                         if not self.recording:
                             print("🛑 Recording stopped")
                             break
 
-                        if response.results:
-                            empty_response_count = 0  # Reset counter
-                            result = response.results[0]
-                            if result.alternatives:
-                                transcript = result.alternatives[0].transcript
-
-                                if result.is_final:
-                                    self.final_text += transcript
-                                    self.current_text = ""
-                                    print(f"✅ Final: '{transcript.strip()}'")
-                                    if self.config.get("auto_type"):
-                                        self._auto_type_new_text()
-                                    self.safe_update_status("Recording", transcript.strip())
-                                    last_interim = ""  # Reset interim tracking
-                                else:
-                                    # Only show interim if it's different from last one
-                                    if transcript != last_interim and transcript.strip():
-                                        self.current_text = transcript
-                                        print(f"🔄 Interim: '{transcript.strip()}'")
-                                        last_interim = transcript
-                        else:
+                        results = response.results
+                        if not results:
                             empty_response_count += 1
                             # Only show empty response message occasionally to avoid spam
                             if empty_response_count == 1:
                                 print("⏳ Listening...")
                             elif empty_response_count % 50 == 0:  # Every 50 empty responses
                                 print(f"⏳ Still listening... ({empty_response_count} empty responses)")
+                            continue
+
+                        empty_response_count = 0  # Reset counter
+                        result = results[0]
+                        alternatives = result.alternatives
+                        if not alternatives:
+                            continue
+                        transcript = alternatives[0].transcript
+
+                        if not result.is_final:
+                            # Only show interim if it's different from last one:
+                            # length and hash first, full compare only on a match
+                            if transcript and not transcript.isspace():
+                                transcript_hash = hash(transcript)
+                                if (len(transcript) != last_interim_len
+                                        or transcript_hash != last_interim_hash
+                                        or transcript != last_interim):
+                                    self.current_text = transcript
+                                    print(f"🔄 Interim: '{transcript.strip()}'")
+                                    last_interim = transcript
+                                    last_interim_len = len(transcript)
+                                    last_interim_hash = transcript_hash
+                            continue
+
+                        self.final_text += transcript
+                        self.current_text = ""
+                        print(f"✅ Final: '{transcript.strip()}'")
+                        if auto_type:
+                            self._auto_type_new_text()
+                        safe_update_status("Recording", transcript.strip())
+                        last_interim = ""  # Reset interim tracking
+                        last_interim_len = 0
+                        last_interim_hash = 0
                 else:
                     print("❌ No responses received")
 
@@ -657,6 +1020,52 @@ class ModernDictationApp:
             self.safe_update_status("Error", f"Recognition error: {str(e)}")
             self.stop_recording()
 
+        finally:
+            with self._riva_lock:
+                self._streaming = False
+            self._close_retired_pools()
+
+    def _flac_encoder(self):
+        """Return ``(encode, finish)`` functions for one FLAC stream of 16-bit PCM
+
+        ``encode(pcm)`` returns the FLAC bytes produced so far (possibly empty);
+        ``finish()`` flushes the final block.
+        """
+        import pyflac
+
+        encoded = []
+        encoder = pyflac.StreamEncoder(
+            write_callback=lambda buffer, *_: encoded.append(bytes(buffer)),
+            sample_rate=self.rate,
+            blocksize=self.chunk
+        )
+
+        def drain():
+            data = b''.join(encoded)
+            encoded.clear()
+            return data
+
+        def encode(pcm):
+            encoder.process(np.frombuffer(pcm, dtype=np.int16))
+            return drain()
+
+        def finish():
+            encoder.finish()
+            return drain()
+
+        return encode, finish
+
+    def _flac_encode(self, chunks):
+        """Encode a stream of 16-bit PCM chunks into a FLAC byte stream"""
+        encode, finish = self._flac_encoder()
+        for chunk in chunks:
+            data = encode(chunk)
+            if data:
+                yield data
+        data = finish()
+        if data:
+            yield data
+
     def _auto_type_new_text(self):
         """Auto-type transcribed text like working version"""
         try:
@@ -664,8 +1073,9 @@ class ModernDictationApp:
             if current_total > self.last_typed_length:
                 new_text = self.final_text[self.last_typed_length:]
                 if new_text.strip():
+                    import pyautogui
                     # Type only the new text
-                    pyautogui.typewrite(new_text, interval=self.config.get("type_interval", 0.01))
+                    pyautogui.typewrite(new_text, interval=self._type_interval)
                     print(f"⌨️ Typed: '{new_text.strip()}'")
                 self.last_typed_length = current_total
         except Exception as e:
@@ -674,13 +1084,17 @@ class ModernDictationApp:
     def quit_app(self, systray=None):
         """Clean up and quit application"""
         self.stop_recording()
-        if self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
+        # The capture thread owns its stream; let it close before PortAudio goes away
+        if self.audio_thread:
+            self.audio_thread.join(timeout=1.0)
         if self.audio:
             self.audio.terminate()
         if hasattr(self, 'keyboard_listener'):
             self.keyboard_listener.stop()
+        if self.channel_pool:
+            self.channel_pool.close()
+        self._close_retired_pools()
+        _SETUP_POOL.shutdown(wait=False)
 
         # Quit GUI components only if not headless
         if not self.headless and self.root:
@@ -728,237 +1142,167 @@ class ModernDictationApp:
             print("💡 Edit configuration file or run without --no-gui flag")
             return
 
+        import tkinter as tk
+        from tkinter import ttk, messagebox
+
+        # Reuse the dialog if it has already been built
+        if self._settings_dialog is not None and self._settings_dialog.winfo_exists():
+            self._load_settings_vars()
+            self._settings_dialog.deiconify()
+            self._settings_dialog.lift()
+            self._settings_dialog.grab_set()
+            return
+
         def _show_settings_dialog():
             dialog = tk.Toplevel(self.root)
             dialog.title("Settings")
             dialog.geometry("500x400")
             dialog.grab_set()
 
+            def close_dialog():
+                dialog.grab_release()
+                dialog.withdraw()
+
+            dialog.protocol("WM_DELETE_WINDOW", close_dialog)
+
             # Create settings form
             form = tk.Frame(dialog, padx=24, pady=24)
             form.pack(fill=tk.BOTH, expand=True)
 
-            # Server settings
-            server_frame = tk.LabelFrame(form, text="Server Settings", padx=16, pady=16)
-            server_frame.pack(fill=tk.X, pady=(0, 16))
-
-            # Endpoint type
-            tk.Label(server_frame, text="Endpoint Type:").pack(anchor=tk.W)
-            endpoint_var = tk.StringVar(value=self.config.get("endpoint_type"))
-            endpoint_combo = ttk.Combobox(server_frame, textvariable=endpoint_var,
-                                        values=["local", "custom"])
-            endpoint_combo.pack(fill=tk.X, pady=(0, 8))
-
-            # Custom endpoint
-            tk.Label(server_frame, text="Custom Endpoint:").pack(anchor=tk.W)
-            custom_endpoint_var = tk.StringVar(value=self.config.get("custom_endpoint"))
-            custom_endpoint_entry = ttk.Entry(server_frame, textvariable=custom_endpoint_var)
-            custom_endpoint_entry.pack(fill=tk.X, pady=(0, 8))
-
-            # Port configuration frame
-            port_frame = tk.Frame(server_frame)
-            port_frame.pack(fill=tk.X, pady=(0, 8))
-
-            # ASR Port
-            tk.Label(port_frame, text="ASR Port:").pack(side=tk.LEFT)
-            asr_port_var = tk.IntVar(value=self.config.get("custom_asr_port", 50051))
-            asr_port_spin = tk.Spinbox(port_frame, from_=1, to=65535, textvariable=asr_port_var, width=8)
-            asr_port_spin.pack(side=tk.LEFT, padx=(5, 15))
-
-            # Separate health port checkbox
-            separate_health_var = tk.BooleanVar(value=self.config.get("use_separate_health_port", False))
-            separate_health_check = ttk.Checkbutton(port_frame, text="Separate Health Port:",
-                                                   variable=separate_health_var)
-            separate_health_check.pack(side=tk.LEFT, padx=(0, 5))
-
-            # Health Port
-            health_port_var = tk.IntVar(value=self.config.get("custom_health_port", 8000))
-            health_port_spin = tk.Spinbox(port_frame, from_=1, to=65535, textvariable=health_port_var, width=8)
-            health_port_spin.pack(side=tk.LEFT, padx=(0, 5))
-
-            # Enable/disable health port based on checkbox
-            def toggle_health_port():
-                if separate_health_var.get():
-                    health_port_spin.config(state='normal')
+            # Build the form from the settings table
+            self._load_settings_vars()
+            sections = {}
+            rows = {}
+            for section, key, label, kind, options in SETTINGS_SCHEMA:
+                frame = sections.get(section)
+                if frame is None:
+                    frame = tk.LabelFrame(form, text=section, padx=16, pady=16)
+                    frame.pack(fill=tk.X, pady=(0, 16))
+                    sections[section] = frame
+
+                options = dict(options)
+                row = options.pop("row", None)
+                enabled_by = options.pop("enabled_by", None)
+
+                var = self._settings_vars[key]
+
+                # Fields sharing a row are laid out left to right in one frame
+                parent = frame
+                if row is not None:
+                    parent = rows.get(row)
+                    if parent is None:
+                        parent = rows[row] = tk.Frame(frame)
+                        parent.pack(fill=tk.X, pady=(0, 8))
+
+                if label and kind != "check":
+                    label_widget = tk.Label(parent, text=label)
+                    if row is not None:
+                        label_widget.pack(side=tk.LEFT, padx=(0, 5))
+                    else:
+                        label_widget.pack(anchor=tk.W)
+
+                if kind == "combo":
+                    widget = ttk.Combobox(parent, textvariable=var, **options)
+                elif kind == "entry":
+                    widget = ttk.Entry(parent, textvariable=var, **options)
+                elif kind == "spin":
+                    widget = tk.Spinbox(parent, textvariable=var, **options)
                 else:
-                    health_port_spin.config(state='disabled')
-
-            separate_health_check.config(command=toggle_health_port)
-            toggle_health_port()  # Set initial state
-
-            # SSL checkbox
-            ssl_var = tk.BooleanVar(value=self.config.get("use_ssl"))
-            ssl_check = ttk.Checkbutton(server_frame, text="Use SSL", variable=ssl_var)
-            ssl_check.pack(anchor=tk.W)
-
-            # Port configuration info
-            port_info = tk.Label(server_frame,
-                text="💡 Port remapping: ASR port for recognition service, Health port for service monitoring",
-                font=("Segoe UI", 9), fg="gray")
-            port_info.pack(anchor=tk.W, pady=(4, 0))
-
-            # General settings
-            general_frame = tk.LabelFrame(form, text="General Settings", padx=16, pady=16)
-            general_frame.pack(fill=tk.X, pady=(0, 16))
-
-            # Auto-type checkbox
-            auto_type_var = tk.BooleanVar(value=self.config.get("auto_type"))
-            auto_type_check = ttk.Checkbutton(general_frame, text="Auto-type text",
-                                            variable=auto_type_var)
-            auto_type_check.pack(anchor=tk.W)
-
-            # Show widget checkbox
-            show_widget_var = tk.BooleanVar(value=self.config.get("show_widget"))
-            show_widget_check = ttk.Checkbutton(general_frame, text="Show status widget",
-                                              variable=show_widget_var)
-            show_widget_check.pack(anchor=tk.W)
-
-            # Hotkey
-            tk.Label(general_frame, text="Hotkey:").pack(anchor=tk.W)
-            hotkey_var = tk.StringVar(value=self.config.get("hotkey"))
-            hotkey_entry = ttk.Entry(general_frame, textvariable=hotkey_var)
-            hotkey_entry.pack(fill=tk.X, pady=(0, 8))
-
-            # ASR Quality settings
-            asr_frame = tk.LabelFrame(form, text="ASR Quality Settings", padx=16, pady=16)
-            asr_frame.pack(fill=tk.X, pady=(0, 16))
-
-            # Audio encoding
-            tk.Label(asr_frame, text="Audio Encoding:").pack(anchor=tk.W)
-            encoding_var = tk.StringVar(value=self.config.get("audio_encoding", "LINEAR_PCM"))
-            encoding_combo = ttk.Combobox(asr_frame, textvariable=encoding_var,
-                                        values=["LINEAR_PCM", "FLAC"], state="readonly")
-            encoding_combo.pack(fill=tk.X, pady=(0, 8))
-
-            # Max alternatives
-            tk.Label(asr_frame, text="Max Alternatives (1-5):").pack(anchor=tk.W)
-            alternatives_var = tk.IntVar(value=self.config.get("max_alternatives", 1))
-            alternatives_spin = tk.Spinbox(asr_frame, from_=1, to=5, textvariable=alternatives_var)
-            alternatives_spin.pack(fill=tk.X, pady=(0, 8))
-
-            # Profanity filter
-            profanity_var = tk.BooleanVar(value=self.config.get("profanity_filter", False))
-            profanity_check = ttk.Checkbutton(asr_frame, text="Enable profanity filter",
-                                            variable=profanity_var)
-            profanity_check.pack(anchor=tk.W)
-
-            # Verbatim transcripts
-            verbatim_var = tk.BooleanVar(value=self.config.get("verbatim_transcripts", False))
-            verbatim_check = ttk.Checkbutton(asr_frame, text="Verbatim transcripts (no text normalization)",
-                                           variable=verbatim_var)
-            verbatim_check.pack(anchor=tk.W)
-
-            # Model name
-            tk.Label(asr_frame, text="Model Name (optional):").pack(anchor=tk.W)
-            model_var = tk.StringVar(value=self.config.get("model_name", ""))
-            model_entry = ttk.Entry(asr_frame, textvariable=model_var)
-            model_entry.pack(fill=tk.X, pady=(0, 8))
-
-            # Speech contexts info
-            contexts_info = tk.Label(asr_frame,
-                text="💡 Tip: Add speech contexts in config file for better recognition of specific terms",
-                font=("Segoe UI", 9), fg="gray")
-            contexts_info.pack(anchor=tk.W, pady=(4, 0))
+                    widget = ttk.Checkbutton(parent, text=label, variable=var, **options)
 
-            def save_settings():
-                # Save server settings
-                self.config.set("endpoint_type", endpoint_var.get())
-                self.config.set("custom_endpoint", custom_endpoint_var.get())
-                self.config.set("custom_asr_port", asr_port_var.get())
-                self.config.set("custom_health_port", health_port_var.get())
-                self.config.set("use_separate_health_port", separate_health_var.get())
-                self.config.set("use_ssl", ssl_var.get())
-
-                # Save general settings
-                self.config.set("auto_type", auto_type_var.get())
-                self.config.set("show_widget", show_widget_var.get())
-                self.config.set("hotkey", hotkey_var.get())
-
-                # Save ASR quality settings
-                self.config.set("audio_encoding", encoding_var.get())
-                self.config.set("max_alternatives", alternatives_var.get())
-                self.config.set("profanity_filter", profanity_var.get())
-                self.config.set("verbatim_transcripts", verbatim_var.get())
-                self.config.set("model_name", model_var.get())
-
-                # Reconnect to Riva with new settings
-                self.setup_riva()
-
-                dialog.destroy()
+                if row is not None:
+                    widget.pack(side=tk.LEFT, padx=(0, 15))
+                elif kind == "check":
+                    widget.pack(anchor=tk.W)
+                else:
+                    widget.pack(fill=tk.X, pady=(0, 8))
 
-            def test_connection():
-                # Test Riva connection using currently selected settings
-                try:
-                    endpoint_type = endpoint_var.get()
-
-                    # Determine server and SSL settings based on selected endpoint type
-                    if endpoint_type == "custom":
-                        custom_endpoint = custom_endpoint_var.get()
-                        custom_asr_port = asr_port_var.get()
-                        test_use_ssl = ssl_var.get()
-
-                        # Build server string with custom port
-                        if custom_endpoint:
-                            # If endpoint already has port, use as-is, otherwise add custom port
-                            if ':' in custom_endpoint:
-                                test_server = custom_endpoint
-                            else:
-                                test_server = f"{custom_endpoint}:{custom_asr_port}"
-                        else:
-                            test_server = f"localhost:{custom_asr_port}"
-                    else:
-                        # Get from predefined endpoints
-                        endpoint_config = self.config.get("endpoints", {}).get(endpoint_type, {})
-                        test_server = endpoint_config.get("server", "localhost:50051")
-                        test_use_ssl = endpoint_config.get("use_ssl", False)
+                # Enable/disable the field from a checkbox; the trace also
+                # fires when values are reloaded from config
+                if enabled_by:
+                    toggle_var = self._settings_vars[enabled_by]
 
-                    print(f"[Test] Testing connection to: {test_server} (SSL: {test_use_ssl})")
+                    def sync_state(*_, widget=widget, toggle_var=toggle_var):
+                        widget.config(state='normal' if toggle_var.get() else 'disabled')
 
-                    # Create auth with appropriate settings
-                    auth = riva.client.Auth(uri=test_server, use_ssl=test_use_ssl)
+                    toggle_var.trace_add("write", sync_state)
+                    sync_state()  # Set initial state
 
-                    # Create test client
-                    test_client = riva.client.ASRService(auth)
+            for section, tip in SETTINGS_TIPS.items():
+                tk.Label(sections[section], text=tip,
+                         font=("Segoe UI", 9), fg="gray").pack(anchor=tk.W, pady=(4, 0))
 
-                    # For now, just verify client creation works
-                    # The fact that we can create the client means authentication is working
-                    print("[Test] ASR client created successfully")
+            settings_vars = self._settings_vars
 
-                    # Show available methods for debugging
-                    methods = [method for method in dir(test_client) if not method.startswith('_') and callable(getattr(test_client, method))]
-                    print(f"[Test] Available methods: {', '.join(methods[:10])}...")
+            def save_settings():
+                # Write the config file once for all settings
+                self.config.update({key: var.get() for key, var in settings_vars.items()})
 
-                    messagebox.showinfo("Connection Test",
-                        f"✅ Connection test successful!\n\nEndpoint: {test_server}\nSSL: {test_use_ssl}\n\nClient created successfully.")
+                self._load_hot_config()
+
+                # Reconnect to Riva with new settings off the Tk thread
+                self.reconnect_riva()
 
+                close_dialog()
+
+            def show_test_result(future, test_server, test_use_ssl):
+                # Back on the Tk thread: report the probe outcome
+                test_button.config(state='normal')
+                try:
+                    model_count = future.result()
+                    messagebox.showinfo("Connection Test",
+                        f"✅ Connection test successful!\n\nEndpoint: {test_server}\nSSL: {test_use_ssl}\n\nASR service responded with {model_count} model(s).")
                 except Exception as e:
                     error_msg = f"❌ Connection test failed:\n\n{str(e)}"
-                    print(f"[Test] {error_msg}")
+                    log.warning("[Test] %s", error_msg)
                     messagebox.showerror("Connection Test", error_msg)
 
+            def test_connection():
+                # Test Riva connection using currently selected settings
+                # Resolve the endpoint from the values currently in the form
+                test_server, test_use_ssl = Config.resolve_endpoint({
+                    "endpoint_type": settings_vars["endpoint_type"].get(),
+                    "custom_endpoint": settings_vars["custom_endpoint"].get(),
+                    "custom_asr_port": settings_vars["custom_asr_port"].get(),
+                    "use_ssl": settings_vars["use_ssl"].get(),
+                }, self.config.endpoints)
+
+                # The probe can block for seconds, so run it off the Tk thread
+                test_button.config(state='disabled')
+                future = _SETUP_POOL.submit(self._probe_connection, test_server, test_use_ssl)
+                future.add_done_callback(
+                    lambda f: self.root.after(0, show_test_result, f, test_server, test_use_ssl))
+
             # Buttons
             button_frame = tk.Frame(form)
             button_frame.pack(fill=tk.X, pady=(0, 16))
 
             test_button = tk.Button(button_frame, text="Test Connection",
                                   font=("Segoe UI", 12),
-                                  bg='#f5f5f5',
-                                  fg='#1976d2',
+                                  bg=_COLORS['surface_variant'],
+                                  fg=_COLORS['primary'],
                                   relief='flat',
                                   command=test_connection)
             test_button.pack(side=tk.LEFT)
 
             save_button = tk.Button(button_frame, text="Save",
                                   font=("Segoe UI", 12),
-                                  bg='#1976d2',
-                                  fg='white',
+                                  bg=_COLORS['primary'],
+                                  fg=_COLORS['on_primary'],
                                   relief='flat',
                                   command=save_settings)
             save_button.pack(side=tk.RIGHT)
 
+            self._settings_dialog = dialog
+
         # Call directly since we're now using mainloop
         _show_settings_dialog()
 
+    def _load_settings_vars(self):
+        """Reset the settings form variables to the current config values"""
+        for key, var in self._settings_vars.items():
+            var.set(self.config.get(key))
+
     @staticmethod
     def signal_handler(sig, frame):
         """Handle system signals"""
@@ -966,182 +1310,4 @@ class ModernDictationApp:
 
     def diagnose_connection(self, server, test_ssl=True):
         """Diagnose connection issues with detailed testing"""
-        print(f"🔍 Diagnosing connection to: {server}")
-
-        # Test 1: Basic network connectivity
-        try:
-            import socket
-            host, port = server.split(':')
-            port = int(port)
-
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5)
-            result = sock.connect_ex((host, port))
-            sock.close()
-
-            if result == 0:
-                print("✅ Network connectivity: Port is reachable")
-            else:
-                print("❌ Network connectivity: Port is not reachable")
-                return False
-        except Exception as e:
-            print(f"❌ Network test failed: {e}")
-            return False
-
-        # Test 2: Check what type of service is running
-        try:
-            import requests
-            response = requests.get(f"http://{server}", timeout=5)
-            print(f"🔀 TCP port responds to HTTP: {response.status_code}")
-            print("💡 This suggests:")
-            print("   - TCP port forwarding to an HTTP service")
-            print("   - Load balancer not configured for gRPC")
-            print("   - Proxy server intercepting connections")
-            print("   - The forwarded destination may not be a gRPC service")
-
-            # Check response headers for clues
-            server_header = response.headers.get('server', '').lower()
-            if 'nginx' in server_header or 'apache' in server_header:
-                print(f"   - Detected web server: {server_header}")
-                print("   - This port is likely forwarded to a web server, not Riva")
-            elif 'riva' in server_header:
-                print(f"   - Detected Riva in headers: {server_header}")
-                print("   - This might be a Riva HTTP gateway")
-
-        except requests.exceptions.ConnectionError:
-            print("✅ No HTTP response: Good sign for gRPC services")
-        except Exception as e:
-            print(f"⚠️ HTTP test inconclusive: {e}")
-
-        # Test 3: gRPC connection attempts
-        connection_results = []
-
-        # Test without SSL
-        try:
-            print("🔄 Testing gRPC without SSL...")
-            auth = riva.client.Auth(uri=server, use_ssl=False)
-            client = riva.client.ASRService(auth)
-            print("✅ gRPC without SSL: Client created successfully")
-
-            # Try a simple streaming test to validate actual functionality
-            try:
-                test_config = RecognitionConfig(
-                    encoding=riva_audio_pb2.AudioEncoding.LINEAR_PCM,
-                    sample_rate_hertz=16000,
-                    language_code="en-US",
-                    max_alternatives=1
-                )
-                streaming_config = riva_asr_pb2.StreamingRecognitionConfig(
-                    config=test_config,
-                    interim_results=False
-                )
-
-                def test_audio_generator():
-                    yield b'\x00' * 32  # Send minimal audio data
-
-                # Use the correct streaming method
-                if hasattr(client, 'streaming_response_generator'):
-                    test_stream = client.streaming_response_generator(
-                        test_audio_generator(),
-                        streaming_config
-                    )
-                    next(test_stream)
-                    print("✅ gRPC streaming test: SUCCESS")
-                    connection_results.append(("gRPC without SSL", True))
-                else:
-                    print("⚠️ No streaming_response_generator method found")
-                    connection_results.append(("gRPC without SSL", False, "No streaming method"))
-
-            except Exception as stream_error:
-                if "http1.x server" in str(stream_error).lower():
-                    print("❌ gRPC streaming test: HTTP response received")
-                    print("💡 Analysis: TCP forwarding to HTTP service")
-                    connection_results.append(("gRPC without SSL", False, "TCP forwarded to HTTP"))
-                else:
-                    print(f"⚠️ gRPC streaming test: {stream_error}")
-                    connection_results.append(("gRPC without SSL", False, str(stream_error)))
-
-        except Exception as e:
-            print(f"❌ gRPC without SSL: {e}")
-            connection_results.append(("gRPC without SSL", False, str(e)))
-
-        # Test with SSL if requested
-        if test_ssl:
-            try:
-                print("🔄 Testing gRPC with SSL...")
-                auth = riva.client.Auth(uri=server, use_ssl=True)
-                client = riva.client.ASRService(auth)
-                print("✅ gRPC with SSL: Client created successfully")
-
-                # Try streaming test with SSL
-                try:
-                    test_config = RecognitionConfig(
-                        encoding=riva_audio_pb2.AudioEncoding.LINEAR_PCM,
-                        sample_rate_hertz=16000,
-                        language_code="en-US",
-                        max_alternatives=1
-                    )
-                    streaming_config = riva_asr_pb2.StreamingRecognitionConfig(
-                        config=test_config,
-                        interim_results=False
-                    )
-
-                    def test_audio_generator():
-                        yield b'\x00' * 32  # Send minimal audio data
-
-                    # Use the correct streaming method
-                    if hasattr(client, 'streaming_response_generator'):
-                        test_stream = client.streaming_response_generator(
-                            test_audio_generator(),
-                            streaming_config
-                        )
-                        next(test_stream)
-                        print("✅ gRPC SSL streaming test: SUCCESS")
-                        connection_results.append(("gRPC with SSL", True))
-                    else:
-                        print("⚠️ No streaming_response_generator method found")
-                        connection_results.append(("gRPC with SSL", False, "No streaming method"))
-
-                except Exception as stream_error:
-                    if "http1.x server" in str(stream_error).lower():
-                        print("❌ gRPC SSL streaming test: HTTP response received")
-                        print("💡 Analysis: TCP forwarding to HTTP service (even with SSL)")
-                        connection_results.append(("gRPC with SSL", False, "TCP forwarded to HTTP"))
-                    else:
-                        print(f"⚠️ gRPC SSL streaming test: {stream_error}")
-                        connection_results.append(("gRPC with SSL", False, str(stream_error)))
-
-            except Exception as e:
-                print(f"❌ gRPC with SSL: {e}")
-                connection_results.append(("gRPC with SSL", False, str(e)))
-
-        # Analyze results and provide recommendations
-        successful_methods = [result[0] for result in connection_results if result[1]]
-        tcp_forwarding_detected = any("TCP forwarded to HTTP" in str(result) for result in connection_results)
-
-        if successful_methods:
-            print(f"✅ Successful connection methods: {', '.join(successful_methods)}")
-            return True
-        elif tcp_forwarding_detected:
-            print("❌ TCP Port Forwarding Issue Detected")
-            print("\n🔍 Analysis:")
-            print("   - The port is reachable via TCP")
-            print("   - gRPC client creation succeeds")
-            print("   - But streaming fails with HTTP responses")
-            print("   - This indicates TCP port forwarding to an HTTP service")
-            print("\n💡 Recommendations for TCP Port Forwarding:")
-            print("   1. Verify the forwarded destination is actually running Riva ASR")
-            print("   2. Check if the destination port is correct for gRPC (usually 50051)")
-            print("   3. Ensure the destination server supports gRPC, not just HTTP")
-            print("   4. Contact your network administrator about the port forwarding configuration")
-            print("   5. Ask for the direct IP/port of the actual Riva server")
-            print("   6. Consider using a gRPC-aware load balancer if one is needed")
-            return False
-        else:
-            print("❌ No successful connection methods found")
-            print("\n💡 General Recommendations:")
-            print("1. Verify this is actually a Riva ASR server")
-            print("2. Check if the port number is correct for gRPC service")
-            print("3. Confirm the server supports the Riva ASR protocol")
-            print("4. Contact your server administrator for the correct gRPC endpoint")
-            return False
\ No newline at end of file
+        return diagnose_connection(server, test_ssl=test_ssl)
\ No newline at end of file
@@ -1,162 +1,232 @@
 import argparse
+import importlib
+import logging
+import os
 import sys
+import threading
 
+log = logging.getLogger("riva_dictation")
 
-def main() -> None:
-    """Command-line entry point for Riva Dictation."""
-    parser = argparse.ArgumentParser(
-        prog="riva-dictation",
-        description="Real-time voice dictation powered by NVIDIA Riva",
-    )
-    parser.add_argument(
-        "--no-gui",
-        action="store_true",
-        help="Run without the floating widget (transcription only)",
-    )
+# Imported lazily by the app on the first recording (FLAC encoder). pyautogui
+# is left out: importing it loads AppKit or opens an X display, which must
+# not happen off the Tk thread
+_WARMUP_MODULES = ("riva.client", "pyflac")
+
+
+def _warmup() -> None:
+    """Preload modules the first recording needs while the app starts up."""
+    for name in _WARMUP_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            # Missing or unusable here; the app reports it when it is needed
+            pass
+
+
+def _cmd_diagnose(args: argparse.Namespace) -> None:
+    """Run connection diagnostics and exit."""
+    try:
+        # Only the slim diagnostics module; no audio, GUI or hotkey stack
+        from riva_dictation.config import Config
+        from riva_dictation.diagnostics import diagnose_connection
+
+        config = Config()
+
+        # Apply CLI configuration overrides for diagnostics
+        if args.endpoint:
+            config.override("endpoint_type", "custom")
+            config.override("custom_endpoint", args.endpoint)
+            config.override("custom_asr_port", args.asr_port)
+            config.override("use_ssl", args.ssl)
+
+        server, _ = config.resolved_endpoint
+        diagnose_connection(server, test_ssl=True)
+
+    except Exception as e:
+        print(f"❌ Error running diagnostics: {e}", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+def _cmd_list_mics(args: argparse.Namespace) -> None:
+    """List available microphone devices and exit."""
+    try:
+        import pyaudio
+        audio = pyaudio.PyAudio()
+        print("🎤 Available Microphone Devices:")
+        print("=" * 50)
+        device_count = audio.get_device_count()
+        for i in range(device_count):
+            info = audio.get_device_info_by_index(i)
+            if info.get('maxInputChannels', 0) > 0:
+                print(f"  {i}: {info['name']} ({info['maxInputChannels']} channels)")
+        audio.terminate()
+    except Exception as e:
+        print(f"❌ Error listing microphones: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _cmd_run(args: argparse.Namespace) -> None:
+    """Start the dictation app."""
+    # Warm up first-recording imports in the background while the app starts
+    threading.Thread(target=_warmup, daemon=True).start()
+
+    # Lazy import so that CLI is fast and dependencies are loaded only when needed.
+    try:
+        from riva_dictation.app import ModernDictationApp
+        from riva_dictation.config import Config
+    except ModuleNotFoundError as e:
+        print(f"❌ Riva Dictation app not found: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ Error importing Riva Dictation app: {e}", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+    # Apply CLI configuration overrides for this session only
+    config = Config()
+
+    # Configure endpoint
+    if args.endpoint:
+        log.info("🔗 Using custom endpoint: %s", args.endpoint)
+        config.override("endpoint_type", "custom")
+        config.override("custom_endpoint", args.endpoint)
+        config.override("custom_asr_port", args.asr_port)
+        if args.health_port:
+            config.override("use_separate_health_port", True)
+            config.override("custom_health_port", args.health_port)
+            log.info("🏥 Health check port: %s", args.health_port)
+        config.override("use_ssl", args.ssl)
+        if args.ssl:
+            log.info("🔒 SSL enabled")
+        log.info("🎯 ASR port: %s", args.asr_port)
+    else:
+        log.info("🏠 Using local endpoint (localhost:50051)")
+        config.override("endpoint_type", "local")
+
+    # Configure microphone
+    if args.mic_device is not None:
+        config.override("input_device_index", args.mic_device)
+        log.info("🎤 Using microphone device: %s", args.mic_device)
+
+    app = ModernDictationApp(headless=args.no_gui, config=config)
+    app.run()
+
+
+def _configure_logging() -> None:
+    """Send riva_dictation log records to stderr at the RIVA_LOG level."""
+    # RIVA_LOG sets the log level; RIVA_DEBUG is kept as a shortcut for DEBUG
+    name = os.environ.get("RIVA_LOG", "DEBUG" if os.environ.get("RIVA_DEBUG") else "INFO")
+    # getLevelName maps known names to ints (getLevelNamesMapping needs 3.11)
+    level = logging.getLevelName(name.upper())
+    logging.basicConfig(format="%(message)s")
+    if not isinstance(level, int):
+        log.warning("⚠️ Unknown RIVA_LOG level %r, using INFO", name)
+        level = logging.INFO
+    # Only our logger; grpc, urllib3 and friends keep the root's WARNING level
+    log.setLevel(level)
+
+
+def _common_parser(suppress_defaults: bool = False) -> argparse.ArgumentParser:
+    """Build the parent parser holding the connection and audio flags.
+
+    Subcommand parsers use ``suppress_defaults`` so that flags given
+    before the subcommand are not reset by the subparser's defaults.
+    """
+    def default(value):
+        return argparse.SUPPRESS if suppress_defaults else value
+
+    common = argparse.ArgumentParser(add_help=False)
 
     # Endpoint configuration
-    parser.add_argument(
+    endpoint = common.add_argument_group("endpoint options")
+    endpoint.add_argument(
         "--endpoint",
         type=str,
+        default=default(None),
         help="Custom endpoint hostname or IP (e.g., my-server.com or 192.168.1.100)",
     )
-    parser.add_argument(
+    endpoint.add_argument(
         "--asr-port",
         type=int,
-        default=50051,
+        default=default(50051),
         help="ASR service port (default: 50051)",
     )
-    parser.add_argument(
+    endpoint.add_argument(
         "--health-port",
         type=int,
+        default=default(None),
         help="Health check port (if different from ASR port)",
     )
-    parser.add_argument(
+    endpoint.add_argument(
         "--ssl",
         action="store_true",
+        default=default(False),
         help="Use SSL/TLS for connection",
     )
 
     # Audio configuration
-    parser.add_argument(
+    audio = common.add_argument_group("audio options")
+    audio.add_argument(
         "--mic-device",
         type=int,
-        help="Microphone device index (use --list-mics to see available devices)",
+        default=default(None),
+        help="Microphone device index (use list-mics to see available devices)",
     )
+    return common
+
+
+def main() -> None:
+    """Command-line entry point for Riva Dictation."""
+    parser = argparse.ArgumentParser(
+        prog="riva-dictation",
+        description="Real-time voice dictation powered by NVIDIA Riva",
+        parents=[_common_parser()],
+    )
+    parser.set_defaults(func=_cmd_run)
     parser.add_argument(
-        "--list-mics",
+        "--no-gui",
         action="store_true",
+        help="Run without the floating widget (transcription only)",
+    )
+
+    # Legacy flags, equivalent to the subcommands below
+    parser.add_argument(
+        "--list-mics",
+        dest="func",
+        action="store_const",
+        const=_cmd_list_mics,
         help="List available microphone devices and exit",
     )
     parser.add_argument(
         "--diagnose",
-        action="store_true",
+        dest="func",
+        action="store_const",
+        const=_cmd_diagnose,
         help="Run connection diagnostics and exit",
     )
 
-    args = parser.parse_args()
-
-    # Handle diagnostics
-    if args.diagnose:
-        try:
-            from riva_dictation.app import ModernDictationApp
-            from riva_dictation.config import Config
-
-            config = Config()
-
-            # Apply CLI configuration overrides for diagnostics
-            if args.endpoint:
-                config.set("endpoint_type", "custom")
-                config.set("custom_endpoint", args.endpoint)
-                config.set("custom_asr_port", args.asr_port)
-                config.set("use_ssl", args.ssl)
-                server = f"{args.endpoint}:{args.asr_port}"
-            else:
-                endpoint_type = config.get("endpoint_type")
-                if endpoint_type == "custom":
-                    custom_endpoint = config.get("custom_endpoint")
-                    custom_asr_port = config.get("custom_asr_port", 50051)
-                    if custom_endpoint:
-                        if ':' in custom_endpoint:
-                            server = custom_endpoint
-                        else:
-                            server = f"{custom_endpoint}:{custom_asr_port}"
-                    else:
-                        server = f"localhost:{custom_asr_port}"
-                else:
-                    endpoint = config.get("endpoints", {}).get(endpoint_type, {})
-                    server = endpoint.get("server", "localhost:50051")
-
-            # Create a temporary app instance for diagnostics
-            app = ModernDictationApp(headless=True)
-            app.diagnose_connection(server, test_ssl=True)
-            return
-
-        except Exception as e:
-            print(f"❌ Error running diagnostics: {e}", file=sys.stderr)
-            import traceback
-            traceback.print_exc()
-            sys.exit(1)
-
-    # Handle list microphones
-    if args.list_mics:
-        try:
-            import pyaudio
-            audio = pyaudio.PyAudio()
-            print("🎤 Available Microphone Devices:")
-            print("=" * 50)
-            device_count = audio.get_device_count()
-            for i in range(device_count):
-                info = audio.get_device_info_by_index(i)
-                if info.get('maxInputChannels', 0) > 0:
-                    print(f"  {i}: {info['name']} ({info['maxInputChannels']} channels)")
-            audio.terminate()
-            return
-        except Exception as e:
-            print(f"❌ Error listing microphones: {e}", file=sys.stderr)
-            sys.exit(1)
-
-    # Lazy import so that CLI is fast and dependencies are loaded only when needed.
-    try:
-        from riva_dictation.app import ModernDictationApp
-        from riva_dictation.config import Config
-    except ModuleNotFoundError as e:
-        print(f"❌ Riva Dictation app not found: {e}", file=sys.stderr)
-        sys.exit(1)
-    except Exception as e:
-        print(f"❌ Error importing Riva Dictation app: {e}", file=sys.stderr)
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
-
-    # Apply CLI configuration overrides
-    config = Config()
+    # Subcommands; each handler imports only what it needs
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+    sub_common = _common_parser(suppress_defaults=True)
+    subparsers.add_parser(
+        "list-mics",
+        parents=[sub_common],
+        help="List available microphone devices and exit",
+    ).set_defaults(func=_cmd_list_mics)
+    subparsers.add_parser(
+        "diagnose",
+        parents=[sub_common],
+        help="Run connection diagnostics (uses --endpoint/--asr-port/--ssl)",
+    ).set_defaults(func=_cmd_diagnose)
 
-    # Configure endpoint
-    if args.endpoint:
-        print(f"🔗 Using custom endpoint: {args.endpoint}")
-        config.set("endpoint_type", "custom")
-        config.set("custom_endpoint", args.endpoint)
-        config.set("custom_asr_port", args.asr_port)
-        if args.health_port:
-            config.set("use_separate_health_port", True)
-            config.set("custom_health_port", args.health_port)
-            print(f"🏥 Health check port: {args.health_port}")
-        config.set("use_ssl", args.ssl)
-        if args.ssl:
-            print("🔒 SSL enabled")
-        print(f"🎯 ASR port: {args.asr_port}")
-    else:
-        print("🏠 Using local endpoint (localhost:50051)")
-        config.set("endpoint_type", "local")
+    args = parser.parse_args()
 
-    # Configure microphone
-    if args.mic_device is not None:
-        config.set("input_device_index", args.mic_device)
-        print(f"🎤 Using microphone device: {args.mic_device}")
+    _configure_logging()
 
-    app = ModernDictationApp(headless=args.no_gui)
-    app.run()
+    args.func(args)
 
 
 if __name__ == "__main__":
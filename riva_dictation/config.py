@@ -2,9 +2,29 @@
 Configuration management for Riva Dictation
 """
 
+import os
 import json
+import functools
+from collections import namedtuple
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any
+from types import SimpleNamespace
+from typing import Dict, Any, Mapping, Tuple
+
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+
+# Marks an overridden key that has no saved value
+_MISSING = object()
+
+# Immutable endpoint preset, built once from the "endpoints" setting
+Endpoint = namedtuple("Endpoint", "server use_ssl description")
 
 class Config:
     """Configuration management with persistence"""
@@ -33,11 +53,13 @@ class Config:
         "use_separate_health_port": False,  # Enable separate health check port
         "connection_timeout": 30,  # Connection timeout in seconds
         "grpc_options": {},  # Additional gRPC channel options
+        "grpc_compression": "none",  # "none", "gzip", "deflate" (helps slow uplinks, overhead on localhost)
+        "grpc_pool_size": 2,  # Number of pooled gRPC channels to the ASR server
         "auto_retry_ssl": True,  # Automatically try SSL if initial connection fails
         "connection_protocol": "grpc",  # "grpc", "grpc-web" (for HTTP proxies)
         "validate_streaming": True,  # Validate streaming capability during connection
         # ASR QUALITY SETTINGS
-        "audio_encoding": "LINEAR_PCM",  # "LINEAR_PCM", "FLAC" (FLAC recommended for bandwidth)
+        "audio_encoding": "FLAC",  # "FLAC" (about half the upload bandwidth, needs pyflac), "LINEAR_PCM"
         "max_alternatives": 1,  # Number of recognition hypotheses (1-5)
         "profanity_filter": False,  # Enable profanity filtering
         "verbatim_transcripts": False,  # True = exactly what was said, False = normalized text
@@ -60,9 +82,20 @@ class Config:
         }
     }
 
+    # Settings that determine the resolved ASR endpoint
+    ENDPOINT_KEYS = frozenset({"endpoint_type", "custom_endpoint", "custom_asr_port", "use_ssl", "endpoints"})
+
     def __init__(self):
         self.config_file = Path.home() / ".riva_dictation_config.json"
         self.config = self.load_config()
+        self.endpoints = self._freeze_endpoints(self.config.get("endpoints", {}))
+        # Unsaved changes, and nesting depth of batch() blocks deferring the save
+        self._dirty = False
+        self._batch_depth = 0
+        # Attribute-access snapshot for hot paths, rebuilt lazily after changes
+        self._snapshot = None
+        # In-memory overrides (e.g. CLI flags): key -> saved value they shadow
+        self._overridden = {}
 
     def load_config(self) -> Dict[str, Any]:
         """Load configuration from file or create defaults"""
@@ -80,16 +113,129 @@ class Config:
         return self.DEFAULT_CONFIG.copy()
 
     def save_config(self):
-        """Save current configuration"""
+        """Save current configuration atomically (no-op if nothing changed)"""
+        if not self._dirty:
+            return
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=2)
+            tmp_file = self.config_file.with_suffix('.tmp')
+            data = self.config
+            if self._overridden:
+                # Persist the saved values, not the transient overrides
+                data = dict(data)
+                for key, saved in self._overridden.items():
+                    if saved is _MISSING:
+                        data.pop(key, None)
+                    else:
+                        data[key] = saved
+            with open(tmp_file, 'wb') as f:
+                f.write(_dumps(data))
+            os.replace(tmp_file, self.config_file)
+            self._dirty = False
         except Exception as e:
             print(f"⚠️ Config save failed: {e}")
 
+    @contextmanager
+    def batch(self):
+        """Defer saving until the outermost batch exits, then write once"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._dirty:
+                self.save_config()
+
+    @property
+    def snapshot(self) -> SimpleNamespace:
+        """Point-in-time attribute copy of the config (e.g. ``config.snapshot.chunk_size``)
+
+        Read it once and keep the reference on hot paths. A new copy is made
+        after a setting changes; the old one is left as it was. It is a plain
+        namespace, so treat it as read-only: writes to it are not saved.
+        """
+        if self._snapshot is None:
+            self._snapshot = SimpleNamespace(**self.config)
+        return self._snapshot
+
+    @staticmethod
+    def _freeze_endpoints(presets: Mapping[str, Mapping[str, Any]]) -> Dict[str, Endpoint]:
+        """Convert the raw endpoint presets into ``Endpoint`` tuples"""
+        return {
+            name: Endpoint(
+                preset.get("server", "localhost:50051"),
+                bool(preset.get("use_ssl", False)),
+                preset.get("description", ""),
+            )
+            for name, preset in presets.items()
+        }
+
+    @staticmethod
+    def resolve_endpoint(settings: Mapping[str, Any],
+                         endpoints: Mapping[str, Endpoint]) -> Tuple[str, bool]:
+        """Return ``(server, use_ssl)`` for the endpoint described by ``settings``
+
+        ``endpoints`` is the frozen preset mapping (``Config.endpoints``).
+        """
+        endpoint_type = settings.get("endpoint_type")
+        if endpoint_type == "custom":
+            custom_endpoint = settings.get("custom_endpoint")
+            custom_asr_port = settings.get("custom_asr_port", 50051)
+
+            # If endpoint already has port, use as-is, otherwise add custom port
+            if custom_endpoint:
+                if ':' in custom_endpoint:
+                    server = custom_endpoint
+                else:
+                    server = f"{custom_endpoint}:{custom_asr_port}"
+            else:
+                server = f"localhost:{custom_asr_port}"
+            return server, bool(settings.get("use_ssl"))
+
+        ep = endpoints.get(endpoint_type)
+        return (ep.server, ep.use_ssl) if ep else ("localhost:50051", False)
+
+    @functools.cached_property
+    def resolved_endpoint(self) -> Tuple[str, bool]:
+        """``(server, use_ssl)`` for the configured endpoint, cached until it changes"""
+        return self.resolve_endpoint(self.config, self.endpoints)
+
     def get(self, key: str, default=None):
         return self.config.get(key, default)
 
-    def set(self, key: str, value):
+    def _apply(self, key: str, value):
+        """Store a value and drop the caches derived from it"""
         self.config[key] = value
-        self.save_config()
\ No newline at end of file
+        self._snapshot = None
+        if key in self.ENDPOINT_KEYS:
+            if key == "endpoints":
+                self.endpoints = self._freeze_endpoints(value)
+            self.__dict__.pop("resolved_endpoint", None)
+
+    def set(self, key: str, value):
+        self._apply(key, value)
+        # An explicit setting replaces any override and is persisted
+        self._overridden.pop(key, None)
+        self._dirty = True
+        if not self._batch_depth:
+            self.save_config()
+
+    def override(self, key: str, value):
+        """Set a value for this session only; it is never written to disk"""
+        self._overridden.setdefault(key, self.config.get(key, _MISSING))
+        self._apply(key, value)
+
+    def is_overridden(self, key: str) -> bool:
+        """Whether key currently holds a session-only override"""
+        return key in self._overridden
+
+    def update(self, values: Dict[str, Any]):
+        """Set several keys with a single save
+
+        Keys whose value is unchanged are skipped, so an override that a
+        form merely echoes back stays in memory and is not persisted.
+        """
+        with self.batch():
+            for key, value in values.items():
+                if key in self.config and self.config[key] == value:
+                    continue
+                self.set(key, value)
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""
+Connection diagnostics for Riva Dictation
+
+Kept separate from the app module so ``--diagnose`` does not load the
+audio, GUI or hotkey stacks.
+"""
+
+import urllib3
+import riva.client
+from riva.client import RecognitionConfig
+import riva.client.proto.riva_asr_pb2 as riva_asr_pb2
+import riva.client.proto.riva_audio_pb2 as riva_audio_pb2
+
+# Shared HTTP connection pool for health checks, created on first use so
+# repeated checks against the same server reuse the TCP connection
+_HTTP = None
+
+
+def _http_pool():
+    """Return the shared HTTP connection pool"""
+    global _HTTP
+    if _HTTP is None:
+        _HTTP = urllib3.PoolManager(num_pools=2, maxsize=2, retries=False,
+                                    timeout=urllib3.Timeout(connect=1.0, read=2.0))
+    return _HTTP
+
+
+def diagnose_connection(server, test_ssl=True):
+    """Diagnose connection issues with detailed testing"""
+    print(f"🔍 Diagnosing connection to: {server}")
+
+    # Test 1: Basic network connectivity
+    try:
+        import socket
+        host, port = server.split(':')
+        port = int(port)
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(5)
+        result = sock.connect_ex((host, port))
+        sock.close()
+
+        if result == 0:
+            print("✅ Network connectivity: Port is reachable")
+        else:
+            print("❌ Network connectivity: Port is not reachable")
+            return False
+    except Exception as e:
+        print(f"❌ Network test failed: {e}")
+        return False
+
+    # Test 2: Check what type of service is running
+    try:
+        response = _http_pool().request('GET', f"http://{server}")
+        print(f"🔀 TCP port responds to HTTP: {response.status}")
+        print("💡 This suggests:")
+        print("   - TCP port forwarding to an HTTP service")
+        print("   - Load balancer not configured for gRPC")
+        print("   - Proxy server intercepting connections")
+        print("   - The forwarded destination may not be a gRPC service")
+
+        # Check response headers for clues
+        server_header = response.headers.get('server', '').lower()
+        if 'nginx' in server_header or 'apache' in server_header:
+            print(f"   - Detected web server: {server_header}")
+            print("   - This port is likely forwarded to a web server, not Riva")
+        elif 'riva' in server_header:
+            print(f"   - Detected Riva in headers: {server_header}")
+            print("   - This might be a Riva HTTP gateway")
+
+    except (urllib3.exceptions.NewConnectionError, urllib3.exceptions.ProtocolError):
+        print("✅ No HTTP response: Good sign for gRPC services")
+    except Exception as e:
+        print(f"⚠️ HTTP test inconclusive: {e}")
+
+    # Test 3: gRPC connection attempts
+    connection_results = []
+
+    # Test without SSL
+    try:
+        print("🔄 Testing gRPC without SSL...")
+        auth = riva.client.Auth(uri=server, use_ssl=False)
+        client = riva.client.ASRService(auth)
+        print("✅ gRPC without SSL: Client created successfully")
+
+        # Try a simple streaming test to validate actual functionality
+        try:
+            test_config = RecognitionConfig(
+                encoding=riva_audio_pb2.AudioEncoding.LINEAR_PCM,
+                sample_rate_hertz=16000,
+                language_code="en-US",
+                max_alternatives=1
+            )
+            streaming_config = riva_asr_pb2.StreamingRecognitionConfig(
+                config=test_config,
+                interim_results=False
+            )
+
+            def test_audio_generator():
+                yield b'\x00' * 32  # Send minimal audio data
+
+            # Use the correct streaming method
+            if hasattr(client, 'streaming_response_generator'):
+                test_stream = client.streaming_response_generator(
+                    test_audio_generator(),
+                    streaming_config
+                )
+                next(test_stream)
+                print("✅ gRPC streaming test: SUCCESS")
+                connection_results.append(("gRPC without SSL", True))
+            else:
+                print("⚠️ No streaming_response_generator method found")
+                connection_results.append(("gRPC without SSL", False, "No streaming method"))
+
+        except Exception as stream_error:
+            if "http1.x server" in str(stream_error).lower():
+                print("❌ gRPC streaming test: HTTP response received")
+                print("💡 Analysis: TCP forwarding to HTTP service")
+                connection_results.append(("gRPC without SSL", False, "TCP forwarded to HTTP"))
+            else:
+                print(f"⚠️ gRPC streaming test: {stream_error}")
+                connection_results.append(("gRPC without SSL", False, str(stream_error)))
+
+    except Exception as e:
+        print(f"❌ gRPC without SSL: {e}")
+        connection_results.append(("gRPC without SSL", False, str(e)))
+
+    # Test with SSL if requested
+    if test_ssl:
+        try:
+            print("🔄 Testing gRPC with SSL...")
+            auth = riva.client.Auth(uri=server, use_ssl=True)
+            client = riva.client.ASRService(auth)
+            print("✅ gRPC with SSL: Client created successfully")
+
+            # Try streaming test with SSL
+            try:
+                test_config = RecognitionConfig(
+                    encoding=riva_audio_pb2.AudioEncoding.LINEAR_PCM,
+                    sample_rate_hertz=16000,
+                    language_code="en-US",
+                    max_alternatives=1
+                )
+                streaming_config = riva_asr_pb2.StreamingRecognitionConfig(
+                    config=test_config,
+                    interim_results=False
+                )
+
+                def test_audio_generator():
+                    yield b'\x00' * 32  # Send minimal audio data
+
+                # Use the correct streaming method
+                if hasattr(client, 'streaming_response_generator'):
+                    test_stream = client.streaming_response_generator(
+                        test_audio_generator(),
+                        streaming_config
+                    )
+                    next(test_stream)
+                    print("✅ gRPC SSL streaming test: SUCCESS")
+                    connection_results.append(("gRPC with SSL", True))
+                else:
+                    print("⚠️ No streaming_response_generator method found")
+                    connection_results.append(("gRPC with SSL", False, "No streaming method"))
+
+            except Exception as stream_error:
+                if "http1.x server" in str(stream_error).lower():
+                    print("❌ gRPC SSL streaming test: HTTP response received")
+                    print("💡 Analysis: TCP forwarding to HTTP service (even with SSL)")
+                    connection_results.append(("gRPC with SSL", False, "TCP forwarded to HTTP"))
+                else:
+                    print(f"⚠️ gRPC SSL streaming test: {stream_error}")
+                    connection_results.append(("gRPC with SSL", False, str(stream_error)))
+
+        except Exception as e:
+            print(f"❌ gRPC with SSL: {e}")
+            connection_results.append(("gRPC with SSL", False, str(e)))
+
+    # Analyze results and provide recommendations
+    successful_methods = [result[0] for result in connection_results if result[1]]
+    tcp_forwarding_detected = any("TCP forwarded to HTTP" in str(result) for result in connection_results)
+
+    if successful_methods:
+        print(f"✅ Successful connection methods: {', '.join(successful_methods)}")
+        return True
+    elif tcp_forwarding_detected:
+        print("❌ TCP Port Forwarding Issue Detected")
+        print("\n🔍 Analysis:")
+        print("   - The port is reachable via TCP")
+        print("   - gRPC client creation succeeds")
+        print("   - But streaming fails with HTTP responses")
+        print("   - This indicates TCP port forwarding to an HTTP service")
+        print("\n💡 Recommendations for TCP Port Forwarding:")
+        print("   1. Verify the forwarded destination is actually running Riva ASR")
+        print("   2. Check if the destination port is correct for gRPC (usually 50051)")
+        print("   3. Ensure the destination server supports gRPC, not just HTTP")
+        print("   4. Contact your network administrator about the port forwarding configuration")
+        print("   5. Ask for the direct IP/port of the actual Riva server")
+        print("   6. Consider using a gRPC-aware load balancer if one is needed")
+        return False
+    else:
+        print("❌ No successful connection methods found")
+        print("\n💡 General Recommendations:")
+        print("1. Verify this is actually a Riva ASR server")
+        print("2. Check if the port number is correct for gRPC service")
+        print("3. Confirm the server supports the Riva ASR protocol")
+        print("4. Contact your server administrator for the correct gRPC endpoint")
+        return False
@@ -5,11 +5,67 @@ UI Components for Riva Dictation
 import tkinter as tk
 from tkinter import ttk
 import queue
+from dataclasses import dataclass
 from typing import Optional
 
+
+@dataclass(frozen=True)
+class Palette:
+    """Material Design color palette"""
+    # Explicit __slots__ (dataclass(slots=True) needs Python 3.10)
+    __slots__ = ('primary', 'primary_variant', 'secondary', 'background', 'surface',
+                 'surface_variant', 'on_surface', 'on_surface_variant', 'success',
+                 'warning', 'error', 'outline')
+    primary: str
+    primary_variant: str
+    secondary: str
+    background: str
+    surface: str
+    surface_variant: str
+    on_surface: str
+    on_surface_variant: str
+    success: str
+    warning: str
+    error: str
+    outline: str
+
+
+PALETTE_LIGHT = Palette(
+    primary='#1976d2',            # Material Blue 700
+    primary_variant='#1565c0',    # Material Blue 800
+    secondary='#03dac6',          # Material Teal 200
+    background='#ffffff',         # Material Surface
+    surface='#ffffff',            # Material Surface
+    surface_variant='#f5f5f5',    # Material Surface Variant
+    on_surface='#1c1b1f',         # Material On Surface
+    on_surface_variant='#49454f', # Material On Surface Variant
+    success='#4caf50',            # Material Green 500
+    warning='#ff9800',            # Material Orange 500
+    error='#f44336',              # Material Red 500
+    outline='#79747e',            # Material Outline
+)
+
+
+def _on_hover_enter(event):
+    """Switch a button to its hover color (``_hover_bg``)"""
+    event.widget.configure(bg=event.widget._hover_bg)
+
+
+def _on_hover_leave(event):
+    """Restore a button's normal color (``_normal_bg``)"""
+    event.widget.configure(bg=event.widget._normal_bg)
+
+
 class CursorIndicator:
     """Simple static red microphone icon that appears when recording"""
 
+    # 20x20 white microphone (PNG), rasterized once and shared by all indicators
+    _MIC_IMG_DATA = (
+        "iVBORw0KGgoAAAANSUhEUgAAABQAAAAUCAYAAACNiR0NAAAAQklEQVR42mNgGAXo4D8aoKphFBs6QgxE1oTPQKIN"
+        "p7qBMMWEkg1JXidGMVlhSTXDaJZssEUUVfPz4DLwPwEwdMtPAASDNthpJTjNAAAAAElFTkSuQmCC"
+    )
+    _MIC_IMG = None
+
     def __init__(self, parent_app):
         self.app = parent_app
         self.indicator = None
@@ -17,7 +73,13 @@ class CursorIndicator:
 
     def show_indicator(self):
         """Show simple recording indicator"""
-        if self.indicator:
+        if self.visible:
+            return
+
+        # Reuse the hidden indicator window after the first show
+        if self.indicator is not None and self.indicator.winfo_exists():
+            self.indicator.deiconify()
+            self.visible = True
             return
 
         self.indicator = tk.Toplevel(self.app.root)
@@ -27,9 +89,11 @@ class CursorIndicator:
         self.indicator.attributes('-alpha', 0.9)
 
         # Position in bottom-right corner (unobtrusive)
+        screen_width = self.indicator.winfo_screenwidth()
+        screen_height = self.indicator.winfo_screenheight()
         self.indicator.geometry("40x40+{}+{}".format(
-            self.indicator.winfo_screenwidth() - 60,
-            self.indicator.winfo_screenheight() - 100
+            screen_width - 60,
+            screen_height - 100
         ))
 
         # Simple red circle with microphone icon (Google Material style)
@@ -38,60 +102,52 @@ class CursorIndicator:
         frame.pack_propagate(False)
 
         # Material Design microphone icon
-        mic_label = tk.Label(frame, text="🎙️", bg='#f44336', fg='white',
-                           font=("Segoe UI", 16))
+        if CursorIndicator._MIC_IMG is None:
+            CursorIndicator._MIC_IMG = tk.PhotoImage(master=self.indicator,
+                                                     data=CursorIndicator._MIC_IMG_DATA)
+        mic_label = tk.Label(frame, image=CursorIndicator._MIC_IMG, bg='#f44336')
         mic_label.pack(expand=True)
 
         self.visible = True
 
     def hide_indicator(self):
         """Hide the recording indicator"""
-        if self.indicator:
-            self.indicator.destroy()
-            self.indicator = None
+        if self.indicator is not None:
+            self.indicator.withdraw()
         self.visible = False
 
 class StatusWidget:
     """Material Design floating status widget"""
 
+    # Queued updates at which the content is unmapped while they are applied
+    BURST_THRESHOLD = 8
+
+    # Thread-safe GUI update queue, drained on <<GuiUpdate>> events; shared
+    # at class level since the app has a single status widget
+    gui_queue = queue.SimpleQueue()
+
     def __init__(self, parent_app):
         self.app = parent_app
         self.root = None
         self.visible = False
-        # Thread-safe GUI update queue
-        self.gui_queue = queue.Queue()
-
-        # Material Design Color Palette
-        self.colors = {
-            'primary': '#1976d2',        # Material Blue 700
-            'primary_variant': '#1565c0', # Material Blue 800
-            'secondary': '#03dac6',      # Material Teal 200
-            'background': '#ffffff',     # Material Surface
-            'surface': '#ffffff',        # Material Surface
-            'surface_variant': '#f5f5f5', # Material Surface Variant
-            'on_surface': '#1c1b1f',     # Material On Surface
-            'on_surface_variant': '#49454f', # Material On Surface Variant
-            'success': '#4caf50',        # Material Green 500
-            'warning': '#ff9800',        # Material Orange 500
-            'error': '#f44336',          # Material Red 500
-            'outline': '#79747e',        # Material Outline
-        }
-
-        # Dark theme colors
-        self.dark_colors = {
-            'primary': '#90caf9',        # Material Blue 200
-            'primary_variant': '#42a5f5', # Material Blue 400
-            'secondary': '#03dac6',      # Material Teal 200
-            'background': '#121212',     # Material Dark Background
-            'surface': '#1e1e1e',        # Material Dark Surface
-            'surface_variant': '#2d2d2d', # Material Dark Surface Variant
-            'on_surface': '#e1e2e3',     # Material Dark On Surface
-            'on_surface_variant': '#c7c5d0', # Material Dark On Surface Variant
-            'success': '#4caf50',
-            'warning': '#ff9800',
-            'error': '#f44336',
-            'outline': '#938f99',
-        }
+        self._heartbeat_id = None
+        # Set while a <<GuiUpdate>> is in flight, so producers wake Tk once per drain
+        self._wakeup_pending = False
+        # Drag state: (window x, window y, pointer x, pointer y) at press
+        self._drag_origin = None
+        self._pending_pos = None
+        self._drag_after_id = None
+        # Message dialog, built on first use and reused afterwards
+        self._dialog = None
+        self._dialog_message = None
+
+        # Material Design palette, shared by all widget instances
+        self.palette = PALETTE_LIGHT
+
+    def _bind_palette(self, palette: "Palette"):
+        """Expose palette colors as attributes (``self._c_primary``, ...) for hot paths"""
+        for name in palette.__slots__:
+            setattr(self, f'_c_{name}', getattr(palette, name))
 
     def initialize(self):
         """Initialize the widget and show it"""
@@ -101,8 +157,9 @@ class StatusWidget:
 
     def create_widget(self):
         """Create Material Design floating widget"""
-        self.root = tk.Toplevel()
+        self.root = tk.Toplevel(self.app.root)
         self.root.title("Riva Dictation")
+        self._bind_palette(self.palette)
 
         # Material Design elevation and styling
         self.setup_material_styling()
@@ -118,14 +175,11 @@ class StatusWidget:
         screen_width = self.root.winfo_screenwidth()
         self.root.geometry(f"320x160+{screen_width - 340}+16")  # 16dp margin
 
-        # Main Material card container
-        self.card_frame = tk.Frame(self.root, bg=self.colors['surface'],
-                                  relief='flat', bd=0)
-        self.card_frame.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)  # 2px shadow
-
-        # Content with Material spacing (16dp padding)
-        self.content_frame = tk.Frame(self.card_frame, bg=self.colors['surface'])
-        self.content_frame.pack(fill=tk.BOTH, expand=True, padx=16, pady=16)
+        # Material card with 16dp content padding; sections are grid rows
+        self.content_frame = tk.Frame(self.root, bg=self._c_surface,
+                                      relief='flat', bd=0, padx=16, pady=16)
+        self.content_frame.grid_columnconfigure(2, weight=1)
+        self._pack_content()
 
         self.create_material_header()
         self.create_material_status()
@@ -134,98 +188,120 @@ class StatusWidget:
         # Material drag behavior
         self.setup_material_dragging()
 
+        # Producers wake the Tk thread with a virtual event instead of polling
+        self.root.bind('<<GuiUpdate>>', lambda e: self.process_gui_updates())
+
+    def _refresh(self):
+        """Redraw pending changes without processing events (Tk thread only)"""
+        self.root.update_idletasks()
+
+    def _pack_content(self):
+        """Pack the card inside the window, leaving a 2px shadow border"""
+        self.content_frame.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
+
     def create_material_header(self):
         """Create Material Design header with title and close button"""
-        header_frame = tk.Frame(self.content_frame, bg=self.colors['surface'])
-        header_frame.pack(fill=tk.X, pady=(0, 16))
-
         # Title with Material typography
-        title_label = tk.Label(header_frame, text="Riva Dictation",
+        title_label = tk.Label(self.content_frame, text="Riva Dictation",
                              font=("Segoe UI", 16, "bold"),
-                             bg=self.colors['surface'],
-                             fg=self.colors['on_surface'])
-        title_label.pack(side=tk.LEFT)
+                             bg=self._c_surface,
+                             fg=self._c_on_surface)
+        title_label.grid(row=0, column=0, columnspan=2, sticky='w', pady=(0, 16))
 
         # Close button with hover effect
-        close_button = tk.Label(header_frame, text="×", font=("Segoe UI", 20),
-                              bg=self.colors['surface'],
-                              fg=self.colors['on_surface_variant'],
+        close_button = tk.Label(self.content_frame, text="×", font=("Segoe UI", 20),
+                              bg=self._c_surface,
+                              fg=self._c_on_surface_variant,
                               cursor="hand2")
-        close_button.pack(side=tk.RIGHT)
+        close_button.grid(row=0, column=2, sticky='ne', pady=(0, 16))
         close_button.bind("<Button-1>", lambda e: self.hide_widget())
 
         # Add hover effects
         def on_enter(e):
-            close_button.configure(fg=self.colors['error'])
+            close_button.configure(fg=self._c_error)
         def on_leave(e):
-            close_button.configure(fg=self.colors['on_surface_variant'])
+            close_button.configure(fg=self._c_on_surface_variant)
 
         close_button.bind("<Enter>", on_enter)
         close_button.bind("<Leave>", on_leave)
 
     def create_material_status(self):
         """Create Material Design status section"""
-        status_frame = tk.Frame(self.content_frame, bg=self.colors['surface'])
-        status_frame.pack(fill=tk.X, pady=(0, 16))
+        # Own row frame spanning every column, so the message doesn't share
+        # column widths with the action buttons below
+        status_frame = tk.Frame(self.content_frame, bg=self._c_surface)
+        status_frame.grid(row=1, column=0, columnspan=3, sticky='ew', pady=(0, 16))
 
         # Status label with Material typography
         self.status_label = tk.Label(status_frame, text="Ready",
                                    font=("Segoe UI", 14),
-                                   bg=self.colors['surface'],
-                                   fg=self.colors['on_surface'])
+                                   bg=self._c_surface,
+                                   fg=self._c_on_surface)
         self.status_label.pack(side=tk.LEFT)
 
-        # Status message with Material typography
+        # Status message with Material typography; takes the rest of the row
         self.message_label = tk.Label(status_frame, text="",
                                     font=("Segoe UI", 12),
-                                    bg=self.colors['surface'],
-                                    fg=self.colors['on_surface_variant'])
-        self.message_label.pack(side=tk.LEFT, padx=(8, 0))
+                                    bg=self._c_surface,
+                                    fg=self._c_on_surface_variant,
+                                    anchor='w', justify=tk.LEFT)
+        self.message_label.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(8, 0))
+        self.message_label.bind("<Configure>", self._fit_message_wrap)
+
+        # Bound configure methods for the update hot path, and the values shown
+        self._set_status_text = self.status_label.configure
+        self._set_message_text = self.message_label.configure
+        self._last_status = "Ready"
+        self._last_message = ""
+
+    def _fit_message_wrap(self, event):
+        """Wrap the message at the width left beside the status text"""
+        if event.width > 1 and int(str(self.message_label.cget('wraplength'))) != event.width:
+            self.message_label.configure(wraplength=event.width)
 
     def create_material_actions(self):
         """Create Material Design action buttons"""
-        actions_frame = tk.Frame(self.content_frame, bg=self.colors['surface'])
-        actions_frame.pack(fill=tk.X)
-
         # Action buttons with Material styling
-        self.record_button = tk.Button(actions_frame, text="Start Recording",
+        self.record_button = tk.Button(self.content_frame, text="Start Recording",
                                      font=("Segoe UI", 12),
-                                     bg=self.colors['primary'],
+                                     bg=self._c_primary,
                                      fg='white',
                                      relief='flat',
                                      cursor="hand2",
                                      command=self.app.toggle_recording)
-        self.record_button.pack(side=tk.LEFT, padx=(0, 8))
+        self.record_button.grid(row=2, column=0, sticky='w', padx=(0, 8))
 
-        self.settings_button = tk.Button(actions_frame, text="Settings",
+        self.settings_button = tk.Button(self.content_frame, text="Settings",
                                        font=("Segoe UI", 12),
-                                       bg=self.colors['surface_variant'],
-                                       fg=self.colors['on_surface_variant'],
+                                       bg=self._c_surface_variant,
+                                       fg=self._c_on_surface_variant,
                                        relief='flat',
                                        cursor="hand2",
                                        command=lambda: self.app.show_settings())
-        self.settings_button.pack(side=tk.LEFT)
-
-        # Add hover effects
+        self.settings_button.grid(row=2, column=1, sticky='w')
+        self._set_record_button = self.record_button.configure
+
+        # Hover colors, read by the shared hover handlers
+        self.record_button._normal_bg = self._c_primary
+        self.record_button._hover_bg = self._c_primary_variant
+        self.settings_button._normal_bg = self._c_surface_variant
+        self.settings_button._hover_bg = self._c_outline
+        self._last_recording = False
+
+        # Hover effects are bound when the pointer first enters the card
+        self._hover_bind_id = self.content_frame.bind("<Enter>", self._bind_hover_effects)
+
+    def _bind_hover_effects(self, event=None):
+        """Bind button hover effects once, on first pointer entry"""
+        self.content_frame.unbind("<Enter>", self._hover_bind_id)
         self.setup_button_hover_effects([self.record_button, self.settings_button])
 
     def setup_button_hover_effects(self, buttons):
         """Setup Material Design hover effects for buttons"""
-        def create_hover_effect(button, normal_color, hover_color):
-            def on_enter(e):
-                button.configure(bg=hover_color)
-            def on_leave(e):
-                button.configure(bg=normal_color)
-            button.bind("<Enter>", on_enter)
-            button.bind("<Leave>", on_leave)
-
-        # Apply hover effects
-        create_hover_effect(self.record_button,
-                          self.colors['primary'],
-                          self.colors['primary_variant'])
-        create_hover_effect(self.settings_button,
-                          self.colors['surface_variant'],
-                          self.colors['outline'])
+        # Colors live on the buttons (_normal_bg/_hover_bg); handlers are shared
+        for button in buttons:
+            button.bind("<Enter>", _on_hover_enter)
+            button.bind("<Leave>", _on_hover_leave)
 
     def setup_material_styling(self):
         """Setup Material Design styling"""
@@ -237,50 +313,120 @@ class StatusWidget:
     def setup_material_dragging(self):
         """Setup Material Design drag behavior"""
         def start_drag(event):
-            self.root._drag_start_x = event.x
-            self.root._drag_start_y = event.y
+            # Window and pointer origin; motion events only need root coordinates
+            self._drag_origin = (self.root.winfo_x(), self.root.winfo_y(),
+                                 event.x_root, event.y_root)
 
         def on_drag(event):
-            x = self.root.winfo_x() - (self.root._drag_start_x - event.x)
-            y = self.root.winfo_y() - (self.root._drag_start_y - event.y)
-            self.root.geometry(f"+{x}+{y}")
+            ox, oy, sx, sy = self._drag_origin
+            self._pending_pos = (ox + event.x_root - sx, oy + event.y_root - sy)
+            # Move at most once per idle cycle, however fast motion events arrive
+            if self._drag_after_id is None:
+                self._drag_after_id = self.root.after_idle(self._apply_drag)
 
         def end_drag(event):
             # Material Design: Return to normal elevation
             pass
 
-        self.card_frame.bind("<Button-1>", start_drag)
-        self.card_frame.bind("<B1-Motion>", on_drag)
-        self.card_frame.bind("<ButtonRelease-1>", end_drag)
+        self.content_frame.bind("<Button-1>", start_drag)
+        self.content_frame.bind("<B1-Motion>", on_drag)
+        self.content_frame.bind("<ButtonRelease-1>", end_drag)
+
+    def _apply_drag(self):
+        """Move the window to the latest drag position"""
+        self._drag_after_id = None
+        self.root.wm_geometry('+%d+%d' % self._pending_pos)
 
     def process_gui_updates(self):
         """Process pending GUI updates from the queue"""
+        # Cleared before draining so an update queued from here on posts a new event
+        self._wakeup_pending = False
+
+        # Drain the queue in one pass
+        items = []
         try:
             while True:
-                update = self.gui_queue.get_nowait()
-                if update['type'] == 'status':
-                    self.status_label.configure(text=update['status'])
-                    self.message_label.configure(text=update.get('message', ''))
-                elif update['type'] == 'recording':
-                    self.record_button.configure(
-                        text="Stop Recording" if update['recording'] else "Start Recording",
-                        bg=self.colors['error'] if update['recording'] else self.colors['primary']
-                    )
-                self.gui_queue.task_done()
+                items.append(self.gui_queue.get_nowait())
         except queue.Empty:
             pass
 
-        # Schedule next update
+        # Only the latest status and recording state are visible, so skip the rest
+        status = recording = None
+        for update in reversed(items):
+            if status is None and update['type'] == 'status':
+                status = update
+            elif recording is None and update['type'] == 'recording':
+                recording = update
+            if status is not None and recording is not None:
+                break
+
+        # Unmap the content during a burst so Tk skips intermediate redraws
+        burst = len(items) >= self.BURST_THRESHOLD
+        if burst:
+            self.content_frame.pack_forget()
+
+        if status is not None:
+            self._apply_status(status['status'], status.get('message', ''))
+        if recording is not None:
+            self._apply_recording(recording['recording'])
+
+        if burst:
+            self._pack_content()
+            self._refresh()
+
+    def _apply_status(self, status: str, message: str):
+        """Set the status labels, skipping configures that change nothing"""
+        if status != self._last_status:
+            self._set_status_text(text=status)
+            self._last_status = status
+        if message != self._last_message:
+            self._set_message_text(text=message)
+            self._last_message = message
+
+    def _apply_recording(self, recording: bool):
+        """Set the record button state if it changed"""
+        if recording != self._last_recording:
+            bg = self._c_error if recording else self._c_primary
+            self._set_record_button(
+                text="Stop Recording" if recording else "Start Recording",
+                bg=bg
+            )
+            # Leaving the button after a hover restores the current state color
+            self.record_button._normal_bg = bg
+            self._last_recording = recording
+
+    def post_update(self, update: dict):
+        """Queue a GUI update and wake the Tk thread (thread-safe)"""
+        self.gui_queue.put(update)
+        # A wakeup is already queued; it will drain this update too
+        if self._wakeup_pending:
+            return
+        if self.root:
+            self._wakeup_pending = True
+            try:
+                self.root.event_generate('<<GuiUpdate>>', when='tail')
+            except (tk.TclError, RuntimeError):
+                # Widget gone or main loop not running; the heartbeat picks it up
+                self._wakeup_pending = False
+
+    def _heartbeat(self):
+        """Slow fallback poll in case an update event was missed"""
+        self._heartbeat_id = None
+        self.process_gui_updates()
         if self.visible:
-            self.root.after(50, self.process_gui_updates)
+            self._heartbeat_id = self.root.after(250, self._heartbeat)
 
     def show_widget(self):
         """Show the status widget"""
         if not self.root:
             self.create_widget()
         self.root.deiconify()
+        self._refresh()
         self.visible = True
-        self.process_gui_updates()
+        if self._heartbeat_id is None:
+            self._heartbeat()
+        else:
+            self.process_gui_updates()
 
     def hide_widget(self):
         """Hide the status widget"""
@@ -297,40 +443,47 @@ class StatusWidget:
 
     def update_status(self, status: str, message: str = ""):
         """Update status and message (thread-safe)"""
-        def _update():
-            self.status_label.configure(text=status)
-            self.message_label.configure(text=message)
-
-        if self.root:
-            self.root.after(0, _update)
+        self.post_update({'type': 'status', 'status': status, 'message': message})
 
     def show_dialog(self, title: str, message: str):
         """Show a Material Design dialog"""
+        def close_dialog():
+            self._dialog.grab_release()
+            self._dialog.withdraw()
+
         def _show_dialog():
-            dialog = tk.Toplevel(self.root)
-            dialog.title(title)
-            dialog.geometry("400x200")
-            dialog.transient(self.root)
-            dialog.grab_set()
-
-            # Material Design dialog content
-            content = tk.Frame(dialog, padx=24, pady=24)
-            content.pack(fill=tk.BOTH, expand=True)
-
-            # Message
-            message_label = tk.Label(content, text=message,
-                                   font=("Segoe UI", 12),
-                                   wraplength=350)
-            message_label.pack(fill=tk.X, pady=(0, 24))
-
-            # OK button
-            ok_button = tk.Button(content, text="OK",
-                                font=("Segoe UI", 12),
-                                bg=self.colors['primary'],
-                                fg='white',
-                                relief='flat',
-                                command=dialog.destroy)
-            ok_button.pack(side=tk.RIGHT)
+            # Reuse the dialog if it has already been built
+            if self._dialog is not None and self._dialog.winfo_exists():
+                self._dialog.deiconify()
+            else:
+                dialog = tk.Toplevel(self.root)
+                dialog.geometry("400x200")
+                dialog.transient(self.root)
+                dialog.protocol("WM_DELETE_WINDOW", close_dialog)
+
+                # Material Design dialog content
+                content = tk.Frame(dialog, padx=24, pady=24)
+                content.pack(fill=tk.BOTH, expand=True)
+
+                # Message
+                self._dialog_message = tk.Label(content,
+                                              font=("Segoe UI", 12),
+                                              wraplength=350)
+                self._dialog_message.pack(fill=tk.X, pady=(0, 24))
+
+                # OK button
+                ok_button = tk.Button(content, text="OK",
+                                    font=("Segoe UI", 12),
+                                    bg=self._c_primary,
+                                    fg='white',
+                                    relief='flat',
+                                    command=close_dialog)
+                ok_button.pack(side=tk.RIGHT)
+                self._dialog = dialog
+
+            self._dialog.title(title)
+            self._dialog_message.configure(text=message)
+            self._dialog.grab_set()
 
         if self.root:
             self.root.after(0, _show_dialog)
\ No newline at end of file
@@ -12,6 +12,8 @@ from riva.client import RecognitionConfig
 import riva.client.proto.riva_asr_pb2 as riva_asr_pb2
 import riva.client.proto.riva_audio_pb2 as riva_audio_pb2
 import time
+import tempfile
+from pathlib import Path
 
 from riva_dictation.app import ModernDictationApp
 from riva_dictation.config import Config
@@ -76,6 +78,122 @@ class TestModernDictationApp(unittest.TestCase):
         self.app.config.set("test_key", "test_value")
         self.assertEqual(self.app.config.get("test_key"), "test_value")
 
+    def test_config_batch_saves_once(self):
+        """Test batched config writes are saved once"""
+        with patch.object(self.app.config, 'save_config') as mock_save:
+            with self.app.config.batch():
+                self.app.config.set("test_key", "a")
+                self.app.config.set("test_key_2", "b")
+                mock_save.assert_not_called()
+            mock_save.assert_called_once()
+        self.assertEqual(self.app.config.get("test_key_2"), "b")
+
+    def test_config_override_not_persisted(self):
+        """Test overrides apply in memory but are not saved"""
+        with patch.object(self.app.config, 'config_file') as mock_file:
+            self.app.config.override("hotkey", "f8")
+            self.assertEqual(self.app.config.get("hotkey"), "f8")
+            self.assertEqual(self.app.config.snapshot.hotkey, "f8")
+            mock_file.with_suffix.assert_not_called()
+
+    def test_config_override_survives_update(self):
+        """Test echoing overridden values through update() does not persist them"""
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch('riva_dictation.config.Path.home', return_value=Path(tmp)):
+            config = Config()
+            config.override("endpoint_type", "custom")
+            config.override("custom_endpoint", "foo")
+
+            # Settings form saves every field, overridden or not
+            config.update({
+                "endpoint_type": "custom",
+                "custom_endpoint": "foo",
+                "hotkey": "f8",
+            })
+
+            reloaded = Config()
+            self.assertEqual(reloaded.get("endpoint_type"), "local")
+            self.assertEqual(reloaded.get("custom_endpoint"), "")
+            self.assertEqual(reloaded.get("hotkey"), "f8")
+
+    def test_remember_ssl_keeps_override(self):
+        """Test the SSL retry does not persist over a CLI override"""
+        with patch.object(self.app.config, 'save_config') as mock_save:
+            self.app.config.override("use_ssl", False)
+            self.app._remember_ssl()
+            self.assertTrue(self.app.config.get("use_ssl"))
+            self.assertTrue(self.app.config.is_overridden("use_ssl"))
+            mock_save.assert_not_called()
+
+    def test_resolved_endpoint(self):
+        """Test resolved endpoint follows endpoint settings"""
+        with patch.object(self.app.config, 'save_config'):
+            self.app.config.set("endpoint_type", "custom")
+            self.app.config.set("custom_endpoint", "riva.example.com")
+            self.app.config.set("custom_asr_port", 50052)
+            self.app.config.set("use_ssl", True)
+            self.assertEqual(self.app.config.resolved_endpoint, ("riva.example.com:50052", True))
+
+            self.app.config.set("custom_endpoint", "riva.example.com:443")
+            self.assertEqual(self.app.config.resolved_endpoint, ("riva.example.com:443", True))
+
+    def test_endpoint_presets(self):
+        """Test endpoint presets are frozen and refreshed on change"""
+        with patch.object(self.app.config, 'save_config'):
+            self.app.config.set("endpoint_type", "cloud")
+            self.app.config.set("endpoints", {
+                "cloud": {"server": "asr.example.com:443", "use_ssl": True, "description": "Cloud"}
+            })
+            self.assertEqual(self.app.config.endpoints["cloud"].server, "asr.example.com:443")
+            self.assertEqual(self.app.config.resolved_endpoint, ("asr.example.com:443", True))
+
+    def test_channel_pool_uses_distinct_connections(self):
+        """Test each pooled channel gets its own connection options"""
+        from riva_dictation.app import RivaChannelPool
+
+        with patch('riva.client.Auth') as mock_auth:
+            RivaChannelPool("localhost:50051", size=3)
+
+        options = [call.kwargs['options'] for call in mock_auth.call_args_list]
+        self.assertEqual(len(options), 3)
+        for opts in options:
+            self.assertIn(('grpc.use_local_subchannel_pool', 1), opts)
+        self.assertEqual(len({tuple(opts) for opts in options}), 3)
+
+    def test_channel_pool_swap_waits_for_stream(self):
+        """Test a pool replaced mid-stream is closed only after the stream ends"""
+        old_pool = MagicMock()
+        self.app.channel_pool = old_pool
+        self.app._streaming = True
+
+        with patch('riva_dictation.app.RivaChannelPool'):
+            self.app._open_channel_pool("localhost:50051", False)
+        old_pool.close.assert_not_called()
+
+        self.app._close_retired_pools()
+        old_pool.close.assert_called_once()
+
+    def test_probe_connection_uses_live_pool(self):
+        """Test Test Connection probes the live pool for the same endpoint"""
+        pool = MagicMock(server="localhost:50051", use_ssl=False)
+        service = pool.get_asr_service.return_value
+        service.stub.GetRivaSpeechRecognitionConfig.return_value.model_config = [1, 2]
+        self.app.channel_pool = pool
+
+        with patch('grpc.channel_ready_future'):
+            self.assertEqual(self.app._probe_connection("localhost:50051", False), 2)
+        self.assertEqual(self.app._auth_cache, {})
+
+    def test_refresh_input_devices(self):
+        """Test refreshing devices reinitializes PortAudio"""
+        old_audio = self.app.audio
+        self.mock_pyaudio.reset_mock()
+
+        self.app._refresh_input_devices()
+
+        old_audio.terminate.assert_called_once()
+        self.mock_pyaudio.assert_called_once()
+
     def test_riva_streaming(self):
         """Test Riva streaming functionality"""
         # Mock Riva streaming response
@@ -99,7 +217,7 @@ class TestModernDictationApp(unittest.TestCase):
 
     def test_toggle_recording(self):
         """Test recording toggle functionality"""
-        with patch.object(self.app, '_capture_audio', side_effect=lambda: time.sleep(0.2)), \
+        with patch.object(self.app, '_capture_audio', side_effect=lambda stop_event: time.sleep(0.2)), \
              patch.object(self.app, '_stream_to_riva', side_effect=lambda: time.sleep(0.2)):
             # Start recording
             self.app.toggle_recording()
@@ -123,7 +241,7 @@ class TestModernDictationApp(unittest.TestCase):
     def test_audio_callback(self):
         """Test audio callback functionality"""
         # Create test audio data
-        test_data = np.random.rand(1024).astype(np.float32).tobytes()
+        test_data = np.random.default_rng(0).standard_normal(1024, dtype=np.float32).tobytes()
 
         # Call audio callback
         result = self.app._audio_callback(test_data, 1024, None, None)
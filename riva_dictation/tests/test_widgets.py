@@ -11,14 +11,26 @@ from riva_dictation.app import ModernDictationApp
 class TestStatusWidget(unittest.TestCase):
     """Test cases for StatusWidget"""
 
+    @classmethod
+    def setUpClass(cls):
+        """Create one hidden Tk root shared by all tests"""
+        cls._root = tk.Tk()
+        cls._root.withdraw()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Destroy the shared Tk root"""
+        cls._root.destroy()
+
     def setUp(self):
         """Set up test environment"""
         # Create mock app
         self.app = MagicMock(spec=ModernDictationApp)
         self.app.config = MagicMock()
         self.app.config.get.return_value = True  # show_widget
+        self.app.root = self._root
 
-        # Create widget
+        # Create widget (its Toplevel is parented to app.root, the shared root)
         self.widget = StatusWidget(self.app)
         self.widget.create_widget()
 
@@ -27,6 +39,7 @@ class TestStatusWidget(unittest.TestCase):
 
     def tearDown(self):
         """Clean up test environment"""
+        # Only the widget's Toplevel; the shared root outlives the test
         if self.widget.root:
             self.widget.root.destroy()
 
@@ -71,6 +84,46 @@ class TestStatusWidget(unittest.TestCase):
         self.assertEqual(self.widget.status_label.cget("text"), "Test Status")
         self.assertEqual(self.widget.message_label.cget("text"), "Test Message")
 
+    def test_process_gui_updates_coalesces(self):
+        """Test only the latest queued status is applied"""
+        for i in range(5):
+            self.widget.gui_queue.put({
+                'type': 'status',
+                'status': f'Status {i}',
+                'message': f'Message {i}'
+            })
+
+        self.widget.process_gui_updates()
+
+        self.assertEqual(self.widget.status_label.cget("text"), "Status 4")
+        self.assertEqual(self.widget.message_label.cget("text"), "Message 4")
+        self.assertTrue(self.widget.gui_queue.empty())
+
+    def test_process_gui_updates_skips_unchanged(self):
+        """Test unchanged status values are not reconfigured"""
+        update = {'type': 'status', 'status': 'Listening', 'message': 'Speak now'}
+        self.widget.gui_queue.put(update)
+        self.widget.process_gui_updates()
+
+        with patch.object(self.widget, '_set_status_text') as mock_set:
+            self.widget.gui_queue.put(dict(update))
+            self.widget.process_gui_updates()
+            mock_set.assert_not_called()
+
+    def test_post_update(self):
+        """Test posted updates are applied on the update event"""
+        self.widget.post_update({
+            'type': 'status',
+            'status': 'Posted Status',
+            'message': 'Posted Message'
+        })
+
+        # Deliver the <<GuiUpdate>> event
+        self.widget.root.update()
+
+        self.assertEqual(self.widget.status_label.cget("text"), "Posted Status")
+        self.assertEqual(self.widget.message_label.cget("text"), "Posted Message")
+
     def test_update_status(self):
         """Test status update functionality"""
         # Update status
@@ -83,13 +136,37 @@ class TestStatusWidget(unittest.TestCase):
         self.assertEqual(self.widget.status_label.cget("text"), "Test Status")
         self.assertEqual(self.widget.message_label.cget("text"), "Test Message")
 
+    def test_show_dialog_reuses_window(self):
+        """Test message dialog is built once and reused"""
+        self.widget.show_dialog("First", "First message")
+        self.widget.root.update()
+        dialog = self.widget._dialog
+
+        self.widget.show_dialog("Second", "Second message")
+        self.widget.root.update()
+
+        self.assertIs(self.widget._dialog, dialog)
+        self.assertEqual(self.widget._dialog_message.cget("text"), "Second message")
+
 class TestCursorIndicator(unittest.TestCase):
     """Test cases for CursorIndicator"""
 
+    @classmethod
+    def setUpClass(cls):
+        """Create one hidden Tk root shared by all tests"""
+        cls._root = tk.Tk()
+        cls._root.withdraw()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Destroy the shared Tk root"""
+        cls._root.destroy()
+
     def setUp(self):
         """Set up test environment"""
         # Create mock app
         self.app = MagicMock(spec=ModernDictationApp)
+        self.app.root = self._root
 
         # Create indicator
         self.indicator = CursorIndicator(self.app)
@@ -112,10 +189,16 @@ class TestCursorIndicator(unittest.TestCase):
         self.assertTrue(self.indicator.visible)
         self.assertIsNotNone(self.indicator.indicator)
 
-        # Hide indicator
+        # Hide indicator; the window is kept for reuse
+        window = self.indicator.indicator
         self.indicator.hide_indicator()
         self.assertFalse(self.indicator.visible)
-        self.assertIsNone(self.indicator.indicator)
+        self.assertEqual(window.state(), 'withdrawn')
+
+        # Show again reuses the same window
+        self.indicator.show_indicator()
+        self.assertTrue(self.indicator.visible)
+        self.assertIs(self.indicator.indicator, window)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file